@@ -0,0 +1,76 @@
+# Write throughput of the disk cache with concurrent writer processes:
+# a single diskcache.Cache vs FanoutCache shards (VDBPY_CACHE_SHARDS).
+#
+#   uv run python benchmarks/bench_cache_shards.py [writes_per_process]
+#
+# Each writer opens the cache the way get_cache() does and sets tagged
+# entries the size of a cached song. FanoutCache drops writes to a shard
+# that stays locked past its timeout; those are counted as dropped.
+
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from tabulate import tabulate
+
+from vdbpy.utils.cache import open_disk_cache
+
+WRITER_COUNTS = (1, 4, 16)
+SHARD_COUNTS = (1, 4, 16)
+VALUE = {"id": 1, "name": "ロミオとシンデレラ", "tags": list(range(200))}
+
+
+def write(
+    directory: Path, shards: int, writer: int, count: int
+) -> tuple[float, float, int]:
+    disk = open_disk_cache(directory, shards, tag_index=True)
+    dropped = 0
+    started = time.time()
+    for i in range(count):
+        if disk.set(f"get_song:v0:{writer}-{i}", VALUE, tag="get_song") is False:
+            dropped += 1
+    finished = time.time()
+    disk.close()
+    return started, finished, dropped
+
+
+def measure(shards: int, writers: int, count: int) -> tuple[float, int]:
+    with (
+        tempfile.TemporaryDirectory() as directory,
+        ProcessPoolExecutor(writers) as executor,
+    ):
+        # Create the databases before the writers race to do it
+        open_disk_cache(Path(directory), shards, tag_index=True).close()
+        results = list(
+            executor.map(
+                write,
+                [Path(directory)] * writers,
+                [shards] * writers,
+                range(writers),
+                [count] * writers,
+            )
+        )
+    elapsed = max(r[1] for r in results) - min(r[0] for r in results)
+    dropped = sum(r[2] for r in results)
+    return (writers * count - dropped) / elapsed, dropped
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rows = []
+    for writers in WRITER_COUNTS:
+        for shards in SHARD_COUNTS:
+            writes_per_second, dropped = measure(shards, writers, count)
+            rows.append((writers, shards, f"{writes_per_second:.0f}", dropped))
+    print(  # noqa: T201
+        tabulate(
+            rows,
+            headers=["writers", "shards", "writes/s", "dropped"],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# Parse time per song search page (fields=Artists,Tags,Albums):
+# requests' Response.json() vs orjson on the raw bytes (parse_json).
+#
+#   uv run python benchmarks/bench_json_decode.py [page_count] [page.json]
+#
+# Without a saved page, a synthetic page of PAGE_SIZE songs shaped like the
+# VocaDB response is used. Save a real one with e.g.
+#   curl "https://vocadb.net/api/songs?maxResults=50&fields=Artists,Tags,Albums" \
+#     -o page.json
+
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import orjson
+from requests import Response
+from tabulate import tabulate
+
+from vdbpy.utils.network import PAGE_SIZE, parse_json
+
+
+def make_song(song_id: int) -> dict[str, Any]:
+    return {
+        "id": song_id,
+        "name": f"ロミオとシンデレラ {song_id}",
+        "defaultName": f"ロミオとシンデレラ {song_id}",
+        "defaultNameLanguage": "Japanese",
+        "artistString": "doriko feat. 初音ミク",
+        "createDate": "2009-04-05T14:22:11.123",
+        "publishDate": "2009-04-05T00:00:00Z",
+        "favoritedTimes": 312,
+        "lengthSeconds": 262,
+        "pvServices": "NicoNicoDouga, Youtube",
+        "ratingScore": 1234,
+        "songType": "Original",
+        "status": "Finished",
+        "version": 42,
+        "artists": [
+            {
+                "artist": {
+                    "id": song_id * 10 + i,
+                    "name": name,
+                    "artistType": artist_type,
+                    "additionalNames": "",
+                    "status": "Finished",
+                    "version": 7,
+                },
+                "categories": categories,
+                "effectiveRoles": "Default",
+                "id": song_id * 100 + i,
+                "isSupport": False,
+                "name": name,
+                "roles": "Default",
+            }
+            for i, (name, artist_type, categories) in enumerate(
+                [
+                    ("doriko", "Producer", "Producer"),
+                    ("初音ミク", "Vocaloid", "Vocalist"),
+                    ("鏡音リン", "Vocaloid", "Vocalist"),
+                ]
+            )
+        ],
+        "tags": [
+            {
+                "count": 20 - i,
+                "tag": {
+                    "id": 100 + i,
+                    "name": f"tag {i}",
+                    "categoryName": "Genres",
+                    "additionalNames": "",
+                    "urlSlug": f"tag-{i}",
+                },
+            }
+            for i in range(12)
+        ],
+        "albums": [
+            {
+                "id": song_id * 5 + i,
+                "name": f"Album {i}",
+                "artistString": "doriko feat. 初音ミク",
+                "catalogNumber": f"VCD-{i:04}",
+                "discType": "Album",
+                "releaseDate": {"year": 2010, "month": 3, "day": 10},
+                "ratingAverage": 4.8,
+                "ratingCount": 120,
+                "status": "Finished",
+                "version": 3,
+            }
+            for i in range(3)
+        ],
+    }
+
+
+def make_page_response(body: bytes) -> Response:
+    r = Response()
+    r.status_code = 200
+    r.headers["Content-Type"] = "application/json; charset=utf-8"
+    r._content = body  # noqa: SLF001
+    return r
+
+
+def measure(parse: Callable[[Response], Any], body: bytes, count: int) -> float:
+    # A new response per page, as a response caches its decoded text
+    responses = [make_page_response(body) for _ in range(count)]
+    started = time.perf_counter()
+    for r in responses:
+        parse(r)
+    return (time.perf_counter() - started) / count * 1000
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    if len(sys.argv) > 2:
+        body = Path(sys.argv[2]).read_bytes()
+    else:
+        items = [make_song(song_id) for song_id in range(PAGE_SIZE)]
+        body = orjson.dumps({"items": items, "totalCount": 100000})
+
+    rows = [
+        ("Response.json()", measure(lambda r: r.json(), body, count)),
+        ("parse_json (orjson)", measure(parse_json, body, count)),
+    ]
+    baseline = rows[0][1]
+    print(f"Page size: {len(body) / 1024:.1f} KiB")  # noqa: T201
+    print(  # noqa: T201
+        tabulate(
+            [(name, f"{ms:.3f}", f"{baseline / ms:.2f}x") for name, ms in rows],
+            headers=[f"{count} pages", "ms/page", "speedup"],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Per-request latency against a local keep-alive server:
+# a fresh connection per request (requests.get) vs the pooled default session.
+#
+#   uv run python benchmarks/bench_session_pool.py [request_count]
+
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from tabulate import tabulate
+
+from vdbpy.utils.network import fetch_json, get_default_session
+
+BODY = b'{"items": [], "totalCount": 0}'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    disable_nagle_algorithm = True  # Headers and body are written separately
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+
+def measure(get: object, url: str, count: int) -> float:
+    assert callable(get)  # noqa: S101
+    get(url)  # Warm up
+    started = time.perf_counter()
+    for _ in range(count):
+        get(url)
+    return (time.perf_counter() - started) / count * 1000
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    server = ThreadingHTTPServer(("localhost", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://localhost:{server.server_address[1]}/api/songs"
+
+    rows = [
+        ("requests.get (new connection)", measure(requests.get, url, count)),
+        ("pooled default session", measure(get_default_session().get, url, count)),
+        ("fetch_json (pooled)", measure(fetch_json, url, count)),
+    ]
+    server.shutdown()
+    baseline = rows[0][1]
+    print(  # noqa: T201
+        tabulate(
+            [(name, f"{ms:.3f}", f"{baseline / ms:.2f}x") for name, ms in rows],
+            headers=[f"{count} requests", "ms/request", "speedup"],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
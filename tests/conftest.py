@@ -2,8 +2,15 @@ from datetime import UTC, datetime, timedelta
 
 import pytest
 
+from vdbpy.utils.retry import reset_retry_state
+
 
 @pytest.fixture
 def yesterday() -> datetime:
     today = datetime.now(UTC)
     return datetime(today.year, today.month, today.day, tzinfo=UTC) - timedelta(days=1)
+
+
+@pytest.fixture(autouse=True)
+def _reset_retry_state() -> None:
+    reset_retry_state()
@@ -0,0 +1,61 @@
+from typing import Any
+
+import orjson
+from requests import Response
+
+LOCAL_URL = "http://localhost/api/songs"
+
+
+def make_response(
+    status_code: int,
+    data: Any = None,
+    url: str = LOCAL_URL,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    r = Response()
+    r.status_code = status_code
+    r.url = url
+    r.reason = "OK" if status_code < 400 else "Error"
+    r.headers.update(headers or {})
+    r._content = orjson.dumps(data if data is not None else {})  # noqa: SLF001
+    return r
+
+
+class FakeSession:
+    """Stand-in for requests.Session serving a paginated listing of `total_count`.
+
+    Statuses in `statuses` are returned (without a body) before any listing page.
+    """
+
+    def __init__(self, total_count: int = 0, statuses: list[int] | None = None):
+        self.total_count = total_count
+        self.statuses = statuses or []
+        self.calls: list[dict[Any, Any]] = []
+
+    def get(self, url: str, params: dict[Any, Any] | None = None, **_: Any):
+        params = dict(params or {})
+        self.calls.append(params)
+        if self.statuses:
+            return make_response(self.statuses.pop(0), url=url)
+        start = int(params.get("start", 0))
+        end = min(start + int(params.get("maxResults", 50)), self.total_count)
+        items = [{"id": i} for i in range(start, end)]
+        return make_response(
+            200, {"items": items, "totalCount": self.total_count}, url=url
+        )
+
+
+class ConditionalSession:
+    """Serves a JSON body with an ETag, and 304 when the client has it already."""
+
+    def __init__(self):
+        self.etag = '"v1"'
+        self.calls: list[dict[str, str]] = []
+
+    def get(self, url: str, headers: dict[str, str] | None = None, **_: Any):
+        headers = headers or {}
+        self.calls.append(headers)
+        if headers.get("If-None-Match") == self.etag:
+            return make_response(304, url=url)
+        data = {"version": self.etag}
+        return make_response(200, data, url=url, headers={"ETag": self.etag})
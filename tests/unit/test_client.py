@@ -0,0 +1,109 @@
+# ruff: noqa: S101
+import threading
+from typing import Any
+
+import pytest
+
+from tests.fakes import FakeSession
+from vdbpy.client import VDBClient, get_client, get_default_client
+from vdbpy.config import SONG_API_URL, WEBSITE
+from vdbpy.utils import network
+from vdbpy.utils.cache import _make_cache_key
+from vdbpy.utils.rate_limit import get_rate_limiter
+
+
+class UrlRecordingSession(FakeSession):
+    def __init__(self, total_count: int = 0):
+        super().__init__(total_count)
+        self.urls: list[str] = []
+
+    def get(self, url: str, params: dict[Any, Any] | None = None, **kwargs: Any):
+        self.urls.append(url)
+        return super().get(url, params, **kwargs)
+
+
+def make_client(
+    monkeypatch: pytest.MonkeyPatch, website: str, total_count: int = 1
+) -> tuple[VDBClient, UrlRecordingSession]:
+    client = VDBClient(website)
+    session = UrlRecordingSession(total_count)
+    monkeypatch.setattr(client, "get_session", lambda: session)
+    return client, session
+
+
+def test_resolve_url_moves_configured_website_urls() -> None:
+    client = VDBClient("http://localhost:8000/")
+    assert client.website == "http://localhost:8000"
+    assert client.resolve_url(f"{SONG_API_URL}/1") == (
+        "http://localhost:8000/api/songs/1"
+    )
+    assert (
+        client.resolve_url("https://wiki.vocadb.net/x") == "https://wiki.vocadb.net/x"
+    )
+    assert client.api_url("songs") == "http://localhost:8000/api/songs"
+    assert get_default_client().resolve_url(SONG_API_URL) == SONG_API_URL
+
+
+def test_use_selects_the_client_for_the_block(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    client, session = make_client(monkeypatch, "http://localhost:8001")
+    assert get_client().is_default
+    with client.use():
+        assert get_client() is client
+        assert network.fetch_json(f"{SONG_API_URL}/1")["totalCount"] == 1
+    assert get_client().is_default
+    assert session.urls == ["http://localhost:8001/api/songs/1"]
+
+
+def test_sub_path_website_is_added_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    client, session = make_client(monkeypatch, f"{WEBSITE}/mirror")
+    url = client.resolve_url(f"{SONG_API_URL}/1")
+    assert url == f"{WEBSITE}/mirror/api/songs/1"
+    assert client.resolve_url(url) == url
+    with client.use():
+        network.fetch_json(f"{SONG_API_URL}/1")
+    assert session.urls == [url]
+
+
+def test_clients_run_in_parallel_threads(monkeypatch: pytest.MonkeyPatch) -> None:
+    clients = [
+        make_client(monkeypatch, f"http://localhost:{port}", total_count=120)
+        for port in (8002, 8003)
+    ]
+
+    def crawl(client: VDBClient) -> None:
+        with client.use():
+            assert len(network.fetch_json_items(SONG_API_URL)) == 120
+
+    threads = [threading.Thread(target=crawl, args=(c,)) for c, _ in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for client, session in clients:
+        assert len(session.urls) == 3
+        assert all(url.startswith(client.website) for url in session.urls)
+
+
+def test_cache_keys_are_namespaced_per_instance() -> None:
+    key = _make_cache_key("get_song", (1,), {})
+    assert _make_cache_key("get_song", (1,), {}) == key
+    with VDBClient("https://beta.vocadb.net").use():
+        assert _make_cache_key("get_song", (1,), {}) == f"beta.vocadb.net:{key}"
+    with VDBClient(WEBSITE).use():
+        assert _make_cache_key("get_song", (1,), {}) == key
+
+
+def test_client_rate_limit_budget() -> None:
+    url = "https://budget.test/api/songs"
+    shared = VDBClient("https://budget.test")
+    own = VDBClient("https://budget.test", rate=5, burst=1)
+    assert shared.get_rate_limiter(url) is get_rate_limiter(url)
+    limiter = own.get_rate_limiter(url)
+    assert limiter is not None
+    assert limiter is not get_rate_limiter(url)
+    assert limiter.rate == 5
+    assert own.get_rate_limiter("https://other.test/api") is get_rate_limiter(
+        "https://other.test/api"
+    )
@@ -1,10 +1,19 @@
 # ruff: noqa: S101
 
+from collections.abc import Iterator
 from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
 
 import pytest
 
-from vdbpy.api.edits import _filter_edits, _merge_edit_lists, _verify_edits
+from vdbpy.api import edits
+from vdbpy.api.edits import (
+    _filter_edits,
+    _get_edits_by_user_id,
+    _merge_edit_lists,
+    _verify_edits,
+)
 from vdbpy.types.shared import EntryType, UserEdit
 
 
@@ -118,3 +127,41 @@ def test_merge_edit_lists_combines_sorted() -> None:
     assert len(result) == 2
     assert result[0].version_id == 1
     assert result[1].version_id == 2
+
+
+def test_sharded_edits_are_split_between_since_and_before(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[tuple[str, str, int]] = []
+
+    def fetch_sharded(
+        _url: str, since: str, before: str, *, shards: int, **_: Any
+    ) -> list[Any]:
+        calls.append((since, before, shards))
+        return []
+
+    monkeypatch.setattr(edits, "find_user_by_username_1d", lambda name: (name, 1))
+    monkeypatch.setattr(edits, "fetch_all_items_between_dates_sharded", fetch_sharded)
+    edits.get_edits_by_username(
+        "user", shards=4, since="2020-01-01T00:00:00Z", before="2024-01-01T00:00:00Z"
+    )
+    assert calls == [("2020-01-01T00:00:00Z", "2024-01-01T00:00:00Z", 4)]
+
+
+def test_saved_crawl_with_another_range_starts_over(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def crash(*_: Any, **__: Any) -> Iterator[list[UserEdit]]:
+        yield [_edit(version_id=1)]
+        msg = "Connection lost"
+        raise RuntimeError(msg)
+
+    def crawl(*_: Any, **__: Any) -> Iterator[list[UserEdit]]:
+        yield [_edit(version_id=2)]
+
+    monkeypatch.setattr(edits, "iter_edits_by_user_id", crash)
+    with pytest.raises(RuntimeError):
+        _get_edits_by_user_id(1, {}, tmp_path, "edits", since="2020-01-01")
+    monkeypatch.setattr(edits, "iter_edits_by_user_id", crawl)
+    result = _get_edits_by_user_id(1, {}, tmp_path, "edits", since="2024-01-01")
+    assert [edit.version_id for edit in result] == [2]
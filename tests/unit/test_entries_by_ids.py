@@ -0,0 +1,59 @@
+# ruff: noqa: S101
+import threading
+import time
+from collections import Counter
+from typing import Any
+
+import pytest
+
+from vdbpy.api import entries
+from vdbpy.utils.priority import get_request_priority
+
+
+def test_get_entries_by_ids_dedupes_and_isolates_errors(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: Counter[int] = Counter()
+    priorities: set[str] = set()
+    lock = threading.Lock()
+
+    def get_cached_raw_entry(
+        entry_type: str, entry_id: int, fields: str = ""
+    ) -> dict[Any, Any]:
+        with lock:
+            calls[entry_id] += 1
+            priorities.add(get_request_priority())
+        time.sleep(0.01)
+        if entry_id == 3:
+            msg = "Server error"
+            raise RuntimeError(msg)
+        return {"id": entry_id, "type": entry_type, "fields": fields}
+
+    monkeypatch.setattr(entries, "get_cached_raw_entry", get_cached_raw_entry)
+    ids = [1, 2, 3, 2, 4, 5, 6, 7, 8, 9, 1]
+    results = dict(
+        entries.get_entries_by_ids("Song", ids, fields={"Tags", "Artists"}, workers=3)
+    )
+    assert set(results) == set(ids)
+    assert isinstance(results.pop(3), RuntimeError)
+    for entry in results.values():
+        assert isinstance(entry, dict)
+        assert entry["fields"] == "Artists,Tags"
+    assert all(count == 1 for count in calls.values())
+    assert priorities == {"bulk"}
+
+
+def test_get_entries_by_ids_streams_before_all_are_fetched(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    fetched: list[int] = []
+
+    def get_cached_raw_entry(_: str, entry_id: int, __: str = "") -> dict[Any, Any]:
+        fetched.append(entry_id)
+        return {"id": entry_id}
+
+    monkeypatch.setattr(entries, "get_cached_raw_entry", get_cached_raw_entry)
+    results = entries.get_entries_by_ids("Artist", range(1000), workers=2)
+    next(results)
+    results.close()
+    assert len(fetched) < 1000
@@ -0,0 +1,59 @@
+# ruff: noqa: S101
+import subprocess
+import sys
+from pathlib import Path
+
+# Cumulative `python -X importtime` budget for the API modules, in seconds.
+# Generous for slow CI runners; imports take around 0.3 s on a laptop.
+IMPORT_TIME_BUDGET = 1.5
+
+MODULES = (
+    "vdbpy.api.songs",
+    "vdbpy.api.users",
+    "vdbpy.api.entries",
+    "vdbpy.utils.graph",
+)
+
+
+def run_import(home: Path) -> subprocess.CompletedProcess[str]:
+    code = "\n".join(
+        [
+            "import sys",
+            *(f"import {module}" for module in MODULES),
+            "assert 'plotly' not in sys.modules, 'plotly was imported'",
+        ]
+    )
+    return subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=False,
+        cwd=home,
+        env={"HOME": str(home), "PATH": ""},
+    )
+
+
+def get_cumulative_seconds(importtime: str) -> float:
+    """Sum the cumulative times of the top-level vdbpy imports."""
+    total_us = 0
+    for line in importtime.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if name.startswith(" vdbpy"):  # Top-level imports aren't indented
+            total_us += int(cumulative)
+    return total_us / 1_000_000
+
+
+def test_import_has_no_side_effects(tmp_path: Path) -> None:
+    result = run_import(tmp_path)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == ""
+    assert list(tmp_path.iterdir()) == []  # The cache isn't opened
+
+
+def test_import_time_is_within_budget(tmp_path: Path) -> None:
+    run_import(tmp_path)  # Warm up the bytecode cache
+    result = run_import(tmp_path)
+    assert result.returncode == 0, result.stderr
+    assert get_cumulative_seconds(result.stderr) < IMPORT_TIME_BUDGET
@@ -0,0 +1,72 @@
+# ruff: noqa: S101
+import json
+import threading
+import zipfile
+from collections.abc import Iterator
+
+import pytest
+
+from vdbpy.parsers.songs import parse_song
+from vdbpy.serve import make_server
+from vdbpy.utils import network
+from vdbpy.utils.dump_sql import DumpDB
+
+
+def _song(song_id: int) -> dict:
+    return {
+        "id": song_id,
+        "songType": "Cover" if song_id % 3 == 0 else "Original",
+        "publishDate": f"2020-01-{1 + song_id % 28:02}",
+        "lengthSeconds": 200,
+        "names": [{"language": "English", "value": f"Song {song_id}"}],
+        "translatedName": {"default": f"Song {song_id}", "defaultLanguage": "English"},
+        "artists": [{"id": 1, "roles": 0, "isSupport": False, "nameHint": "P"}],
+        "pvs": [{"service": "Youtube", "pvType": "Original", "pvId": f"pv{song_id}"}],
+        "tags": [{"count": 1, "tag": {"id": 2, "nameHint": "rock"}}],
+    }
+
+
+@pytest.fixture(scope="module")
+def base_url(tmp_path_factory: pytest.TempPathFactory) -> Iterator[str]:
+    dump_path = tmp_path_factory.mktemp("dump") / "dump.zip"
+    with zipfile.ZipFile(dump_path, "w") as z:
+        z.writestr("Songs/1.json", json.dumps([_song(i) for i in range(1, 121)]))
+        z.writestr(
+            "Artists/1.json",
+            json.dumps([{"id": 1, "artistType": "Producer", "names": []}]),
+        )
+        z.writestr(
+            "Tags/1.json",
+            json.dumps([{"id": 2, "categoryName": "Genres", "names": []}]),
+        )
+    server = make_server(DumpDB.build(dump_path), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{server.server_address[1]}/api"
+    server.shutdown()
+    server.server_close()
+
+
+def test_song_search_pages(base_url: str) -> None:
+    items, total_count = network.fetch_json_items_with_total_count(
+        f"{base_url}/songs", params={"songTypes": "Original"}
+    )
+    assert total_count == 80
+    assert len({item["id"] for item in items}) == 80
+
+
+def test_song_details_parse(base_url: str) -> None:
+    data = network.fetch_json(f"{base_url}/songs/5", params={"fields": "Tags"})
+    song = parse_song(data, fields={"tags"})
+    assert song.artist_string == "P"
+    assert song.pv_services == ["Youtube"]
+    assert [tag.tag_id for tag in song.tags] == [2]  # type: ignore
+    assert network.fetch_json(f"{base_url}/songs/999") == {}
+
+
+def test_artist_search_and_tag(base_url: str) -> None:
+    artists = network.fetch_json_items(
+        f"{base_url}/artists", params={"artistTypes": "Producer"}
+    )
+    assert [artist["id"] for artist in artists] == [1]
+    assert network.fetch_json(f"{base_url}/tags/2")["categoryName"] == "Genres"
@@ -0,0 +1,59 @@
+# ruff: noqa: S101
+from typing import Any
+
+import pytest
+
+from vdbpy.api import songs
+from vdbpy.parsers.songs import get_song_fields_for_projection
+
+SONG = {
+    "id": 1,
+    "createDate": "2009-04-05T14:22:11",
+    "defaultName": "ロミオとシンデレラ",
+    "defaultNameLanguage": "Japanese",
+    "version": 42,
+    "status": "Finished",
+    "artistString": "doriko feat. 初音ミク",
+    "favoritedTimes": 312,
+    "lengthSeconds": 262,
+    "pvServices": "NicoNicoDouga",
+    "ratingScore": 1234,
+    "songType": "Original",
+    "tags": [],
+}
+
+
+def test_projection_maps_attributes_to_minimal_fields() -> None:
+    assert get_song_fields_for_projection({"rating_score"}) == set()
+    assert get_song_fields_for_projection({"tags", "aliases", "min_milli_bpm"}) == {
+        "tags",
+        "names",
+        "bpm",
+    }
+    with pytest.raises(ValueError, match="ratings"):
+        get_song_fields_for_projection({"ratings"})
+
+
+def test_search_requests_and_parses_only_projected_fields(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    requested: list[dict[Any, Any]] = []
+
+    def fetch_json_items_with_total_count(
+        _url: str, params: dict[Any, Any], **_: Any
+    ) -> tuple[list[dict[Any, Any]], int]:
+        requested.append(params)
+        # Groups that weren't asked for are ignored even if present
+        return [{**SONG, "albums": [{"id": 1}]}], 1
+
+    monkeypatch.setattr(
+        songs, "fetch_json_items_with_total_count", fetch_json_items_with_total_count
+    )
+    entries, total_count = songs.get_songs_with_total_count(
+        projection={"tags", "rating_score"}
+    )
+    assert requested[0]["fields"] == "tags"
+    assert total_count == 1
+    assert entries[0].tags == []
+    assert entries[0].albums == "Unknown"
+    assert entries[0].rating_score == 1234
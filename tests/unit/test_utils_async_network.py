@@ -0,0 +1,73 @@
+# ruff: noqa: S101
+import asyncio
+
+import pytest
+
+from tests.fakes import LOCAL_URL as URL
+from tests.fakes import FakeSession
+from vdbpy.utils import async_network, network
+
+
+@pytest.fixture(autouse=True)
+def _no_retry_wait(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(network, "backoff_delay", lambda *_: 0)
+
+
+def test_fetch_json_returns_empty_dict_on_404() -> None:
+    session = FakeSession(statuses=[404])
+    result = asyncio.run(async_network.fetch_json(URL, session=session))  # type: ignore
+    assert result == {}
+    assert len(session.calls) == 1
+
+
+def test_fetch_with_retries_retries_server_errors() -> None:
+    session = FakeSession(total_count=1, statuses=[500, 500])
+    result = asyncio.run(async_network.fetch_json(URL, session=session))  # type: ignore
+    assert result["totalCount"] == 1
+    assert len(session.calls) == 3
+
+
+def test_fetch_with_retries_gives_up() -> None:
+    session = FakeSession(statuses=[500, 500])
+    with pytest.raises(Exception, match="after 2 retries"):
+        asyncio.run(
+            async_network.fetch_with_retries(URL, session=session, max_retries=2)  # type: ignore
+        )
+
+
+def test_fetch_json_items_with_total_count_keeps_page_order() -> None:
+    session = FakeSession(total_count=420)
+    items, total_count = asyncio.run(
+        async_network.fetch_json_items_with_total_count(URL, session=session)  # type: ignore
+    )
+    assert total_count == 420
+    assert [item["id"] for item in items] == list(range(420))
+
+
+def test_fetch_json_items_respects_max_results_and_limit() -> None:
+    session = FakeSession(total_count=1000)
+    items = asyncio.run(
+        async_network.fetch_json_items(URL, session=session, max_results=120)  # type: ignore
+    )
+    assert len(items) == 120
+
+    items = asyncio.run(
+        async_network.fetch_json_items(URL, session=session, limit=75)  # type: ignore
+    )
+    assert len(items) == 75
+
+    items = asyncio.run(
+        async_network.fetch_json_items(
+            URL,
+            session=session,  # type: ignore
+            limit=lambda item: item["id"] == 130,
+        )
+    )
+    assert len(items) == 130
+
+
+def test_fetch_total_count() -> None:
+    session = FakeSession(total_count=7)
+    count = asyncio.run(async_network.fetch_total_count(URL, session=session))  # type: ignore
+    assert count == 7
+    assert session.calls[0]["maxResults"] == 1
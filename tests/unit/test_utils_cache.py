@@ -0,0 +1,309 @@
+# ruff: noqa: S101
+import pickle
+import time
+from collections.abc import Callable
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+import diskcache as dc
+import pytest
+
+from vdbpy.utils import cache as cache_module
+from vdbpy.utils.cache import (
+    DiskCache,
+    MemoryCache,
+    _make_cache_key,
+    _make_legacy_cache_key,
+    cache_conditionally,
+    cache_with_expiration,
+    cache_without_expiration,
+    clear_cache_namespace,
+    get_cache,
+    open_disk_cache,
+)
+
+
+@pytest.fixture(params=[1, 4], ids=["single", "sharded"])
+def disk_cache(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> DiskCache:
+    disk = open_disk_cache(tmp_path, request.param, tag_index=True)
+    monkeypatch.setattr(cache_module, "_cache", disk)
+    monkeypatch.setattr(cache_module, "memory_cache", MemoryCache())
+    monkeypatch.setattr(cache_module, "_checked_versions", set())
+    return disk
+
+
+@pytest.mark.usefixtures("disk_cache")
+def test_hits_are_served_from_memory_as_copies() -> None:
+    calls: list[int] = []
+
+    @cache_without_expiration()
+    def get_tag(tag_id: int) -> dict[str, Any]:
+        calls.append(tag_id)
+        return {"id": tag_id, "names": ["tag"]}
+
+    get_tag(1)["names"].append("modified")
+    assert get_tag(1) == {"id": 1, "names": ["tag"]}
+    assert get_tag(1) is not get_tag(1)
+    assert calls == [1]
+    stats = cache_module.get_memory_cache_stats()
+    assert stats.hits == 3
+    assert get_tag.__name__ == "get_tag"
+
+
+@pytest.mark.usefixtures("disk_cache")
+def test_disk_hits_fill_the_memory_tier() -> None:
+    calls: list[int] = []
+
+    @cache_with_expiration(days=1)
+    def get_username(user_id: int) -> str:
+        calls.append(user_id)
+        return f"user{user_id}"
+
+    assert get_username(1) == "user1"
+    cache_module.memory_cache.clear()
+    assert get_username(1) == "user1"
+    assert get_username(1) == "user1"
+    assert calls == [1]
+    assert cache_module.get_memory_cache_stats().hits == 1
+
+
+@pytest.mark.usefixtures("disk_cache")
+def test_memory_entries_expire_with_the_disk_entries() -> None:
+    calls: list[int] = []
+
+    @cache_with_expiration(hours=0.05 / 3600)
+    def get_count(entry_id: int) -> int:
+        calls.append(entry_id)
+        return entry_id
+
+    get_count(1)
+    get_count(1)
+    time.sleep(0.06)
+    get_count(1)
+    assert calls == [1, 1]
+
+
+def test_cache_conditionally_expires_only_falsy_results(disk_cache: DiskCache) -> None:
+    @cache_conditionally(days=1)
+    def find(value: int) -> int:
+        return value
+
+    find(0)
+    find(1)
+    expire_times = {
+        value: disk_cache.get(key, expire_time=True)[1]
+        for value, key in (
+            (0, _make_cache_key("find", (0,), {})),
+            (1, _make_cache_key("find", (1,), {})),
+        )
+    }
+    assert expire_times[0] is not None
+    assert expire_times[1] is None
+
+
+def test_memory_cache_is_bounded_by_entries_and_bytes() -> None:
+    memory = MemoryCache(max_entries=2, max_bytes=100)
+    memory.set("a", pickle.dumps(1), None)
+    memory.set("b", pickle.dumps(2), None)
+    assert memory.get("a") is not None  # "b" becomes the least recently used
+    memory.set("c", pickle.dumps(3), None)
+    assert memory.get("b") is None
+    assert memory.get("a") is not None
+
+    memory.set("big", b"x" * 90, None)
+    assert memory.size <= 100
+    assert memory.get("big") is not None
+    memory.set("huge", b"x" * 101, None)
+    assert memory.get("huge") is None
+    assert memory.get_stats().evictions >= 2
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 2) -> None:
+    started = time.monotonic()
+    while not condition():
+        assert time.monotonic() - started < timeout
+        time.sleep(0.01)
+
+
+@pytest.mark.usefixtures("disk_cache")
+def test_stale_value_is_served_while_refreshing() -> None:
+    versions = [1]
+
+    @cache_with_expiration(
+        hours=0.05 / 3600, stale_while_revalidate=timedelta(seconds=10)
+    )
+    def get_version(_: int) -> int:
+        if versions[-1] > 1:
+            time.sleep(0.2)  # A slow refresh
+        return versions[-1]
+
+    assert get_version(1) == 1
+    time.sleep(0.06)
+    versions.append(2)
+    started = time.monotonic()
+    assert get_version(1) == 1
+    assert time.monotonic() - started < 0.1
+    wait_for(lambda: get_version(1) == 2)
+
+
+@pytest.mark.usefixtures("disk_cache")
+def test_failed_refresh_keeps_the_stale_value() -> None:
+    calls: list[int] = []
+
+    @cache_with_expiration(
+        hours=0.05 / 3600, stale_while_revalidate=timedelta(seconds=10)
+    )
+    def get_name(entry_id: int) -> str:
+        calls.append(entry_id)
+        if len(calls) > 1:
+            msg = "Server error"
+            raise RuntimeError(msg)
+        return "name"
+
+    get_name(1)
+    time.sleep(0.06)
+    assert get_name(1) == "name"
+    wait_for(lambda: len(calls) == 2)
+    assert get_name(1) == "name"
+
+
+@pytest.mark.usefixtures("disk_cache")
+def test_values_past_max_staleness_are_fetched_on_the_request_path() -> None:
+    calls: list[int] = []
+
+    @cache_with_expiration(
+        hours=0.02 / 3600, stale_while_revalidate=timedelta(seconds=0.03)
+    )
+    def get_count(entry_id: int) -> int:
+        calls.append(entry_id)
+        return len(calls)
+
+    assert get_count(1) == 1
+    time.sleep(0.06)
+    assert get_count(1) == 2
+
+
+def test_cache_keys_are_compact_and_canonical() -> None:
+    key = _make_cache_key("get_songs", ({3, 1, 2},), {"b": 1, "a": {"x": [1]}})
+    assert key.startswith("get_songs:v0:")
+    assert len(key) == len("get_songs:v0:") + 32
+    assert key == _make_cache_key("get_songs", ({2, 3, 1},), {"a": {"x": [1]}, "b": 1})
+    assert key != _make_cache_key("get_songs", ({3, 1, 2},), {"b": 2, "a": {"x": [1]}})
+    assert _make_cache_key("get_songs", (), {}, version=2).startswith("get_songs:v2:")
+    assert _make_cache_key("get_songs", (10**30,), {}) != key
+    assert _make_cache_key("get_songs", ({1: "a"},), {}) != _make_cache_key(
+        "get_songs", ({"1": "a"},), {}
+    )
+
+
+def test_legacy_entries_are_read_and_moved(disk_cache: DiskCache) -> None:
+    legacy_key = _make_legacy_cache_key("get_username", (1,), {})
+    disk_cache.set(legacy_key, "legacy name", expire=60)
+
+    @cache_with_expiration(days=1)
+    def get_username(user_id: int) -> str:
+        return f"user{user_id}"
+
+    assert get_username(1) == "legacy name"
+    assert legacy_key not in disk_cache
+    assert disk_cache.get(_make_cache_key("get_username", (1,), {})) == "legacy name"
+
+
+def test_version_bump_clears_only_the_functions_namespace(
+    disk_cache: DiskCache,
+) -> None:
+    @cache_without_expiration()
+    def get_tag(_: int) -> str:
+        return "old"
+
+    @cache_without_expiration()
+    def get_user(_: int) -> str:
+        return "user"
+
+    get_tag(1)
+    get_tag(2)
+    get_user(1)
+    assert len(disk_cache) == 3
+
+    @cache_without_expiration(version=1)
+    def get_tag(_: int) -> str:
+        return "new"
+
+    assert get_tag(1) == "new"
+    assert disk_cache.get(_make_cache_key("get_user", (1,), {})) == "user"
+    assert len(disk_cache) == 3  # get_user, the new get_tag and its version
+    assert clear_cache_namespace(get_user) == 1
+    assert len(disk_cache) == 2
+
+
+def test_cache_shards_are_configurable(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.chdir(tmp_path)  # The cache directory without ~/.cache
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(cache_module, "CACHE_SHARDS", 4)
+    monkeypatch.setattr(cache_module, "_cache", None)
+    disk = get_cache()
+    assert isinstance(disk, dc.FanoutCache)
+    assert disk.directory.endswith("shards-4")
+    assert get_cache() is disk
+    disk.close()
+
+
+def test_busy_shards_are_treated_as_misses(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(
+        cache_module, "_cache", open_disk_cache(tmp_path, 4, tag_index=True)
+    )
+    monkeypatch.setattr(cache_module, "memory_cache", MemoryCache())
+    monkeypatch.setattr(cache_module, "_checked_versions", set())
+
+    def get(*_: Any, **__: Any) -> Any:
+        raise dc.Timeout
+
+    monkeypatch.setattr(dc.Cache, "get", get)  # Every shard is locked
+    calls: list[int] = []
+
+    @cache_with_expiration(days=1)
+    def get_username(user_id: int) -> str:
+        calls.append(user_id)
+        return f"user{user_id}"
+
+    assert get_username(1) == "user1"
+    cache_module.memory_cache.clear()
+    assert get_username(1) == "user1"
+    assert calls == [1, 1]
+
+
+def test_busy_shard_doesnt_clear_a_versioned_namespace(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    disk = open_disk_cache(tmp_path, 4, tag_index=True)
+    monkeypatch.setattr(cache_module, "_cache", disk)
+    monkeypatch.setattr(cache_module, "memory_cache", MemoryCache())
+    monkeypatch.setattr(cache_module, "_checked_versions", set())
+    calls: list[int] = []
+
+    @cache_without_expiration(version=1)
+    def get_tag(tag_id: int) -> str:
+        calls.append(tag_id)
+        return "tag"
+
+    get_tag(1)
+    cache_module.memory_cache.clear()
+    cache_module._checked_versions.clear()  # noqa: SLF001 # A new process
+    get = dc.Cache.get
+
+    def get_busy_version(self: dc.Cache, key: str, *args: Any, **kwargs: Any) -> Any:
+        if key.startswith("__version__"):
+            raise dc.Timeout
+        return get(self, key, *args, **kwargs)
+
+    monkeypatch.setattr(dc.Cache, "get", get_busy_version)
+    assert get_tag(1) == "tag"
+    assert calls == [1]
+    assert len(disk) == 2  # The entry and the version
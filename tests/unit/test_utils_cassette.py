@@ -0,0 +1,74 @@
+# ruff: noqa: S101
+from collections.abc import Iterator
+from pathlib import Path
+
+import diskcache as dc
+import pytest
+
+from tests.fakes import LOCAL_URL as URL
+from tests.fakes import ConditionalSession, FakeSession
+from vdbpy.utils import network
+from vdbpy.utils.cassette import Cassette, CassetteMissError, use_cassette
+
+
+@pytest.fixture(autouse=True)
+def _no_cassette() -> Iterator[None]:
+    yield
+    use_cassette(None)
+
+
+def record(path: Path) -> FakeSession:
+    session = FakeSession(total_count=120)
+    cassette = Cassette(path, "record")
+    use_cassette(cassette)
+    network.fetch_json_items(URL, session=session)  # type: ignore
+    cassette.save_index()
+    return session
+
+
+def test_replay_serves_recorded_responses_without_network(tmp_path: Path) -> None:
+    path = tmp_path / "run.cassette"
+    recorded = record(path)
+    assert len(recorded.calls) == 3
+
+    use_cassette(Cassette(path, "replay"))
+    session = FakeSession(total_count=999)
+    items = network.fetch_json_items(URL, session=session)  # type: ignore
+    assert [item["id"] for item in items] == list(range(120))
+    assert not session.calls
+
+
+def test_replay_rebuilds_a_missing_index(tmp_path: Path) -> None:
+    path = tmp_path / "run.cassette"
+    record(path)
+    path.with_name(f"{path.name}.index").unlink()
+
+    use_cassette(Cassette(path, "replay"))
+    assert len(network.fetch_json_items(URL)) == 120
+
+
+def test_replay_miss_raises(tmp_path: Path) -> None:
+    path = tmp_path / "run.cassette"
+    record(path)
+
+    use_cassette(Cassette(path, "replay"))
+    with pytest.raises(CassetteMissError):
+        network.fetch_json(f"{URL}/1")
+
+
+def test_revalidated_requests_replay(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    session = ConditionalSession()
+    monkeypatch.setattr(network, "get_default_session", lambda: session)
+    monkeypatch.setattr(network, "_http_cache", dc.Cache(str(tmp_path / "http")))
+    path = tmp_path / "run.cassette"
+    cassette = Cassette(path, "record")
+    use_cassette(cassette)
+    assert network.fetch_json(URL, revalidate=True) == {"version": '"v1"'}
+    assert network.fetch_json(URL, revalidate=True) == {"version": '"v1"'}
+    cassette.save_index()
+    assert session.calls == [{}, {}]
+
+    use_cassette(Cassette(path, "replay"))
+    assert network.fetch_json(URL, revalidate=True) == {"version": '"v1"'}
@@ -0,0 +1,120 @@
+# ruff: noqa: S101
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from tests.fakes import LOCAL_URL as URL
+from vdbpy.utils import network
+from vdbpy.utils.cursor import DateCursor
+
+# Newest first, with several items sharing a date at the page boundaries
+FEED = [
+    {"id": i, "createDate": f"2025-01-{date:02}T00:00:00Z"}
+    for i, date in enumerate([9, 9, 8, 8, 8, 7, 6, 6, 5, 5, 5, 4, 3])
+]
+
+
+def fake_feed(_url: str, params: dict[Any, Any], **_: Any) -> dict[Any, Any]:
+    """Return the items dated from `since` to `before` inclusive, newest first."""
+    items = [
+        item
+        for item in FEED
+        if params.get("since", "") <= item["createDate"] <= params["before"]
+    ]
+    return {"items": items[: params["maxResults"]]}
+
+
+@pytest.fixture(autouse=True)
+def _fake_feed(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(network, "fetch_json", fake_feed)
+
+
+def test_items_between_dates_are_deduplicated() -> None:
+    items = list(network.iter_items_between_dates(URL, before="9999", page_size=4))
+    assert items == FEED
+
+
+def test_fetch_all_items_between_dates_limit() -> None:
+    items, limit_reached = network.fetch_all_items_between_dates(
+        URL, before="9999", page_size=4, limit=6
+    )
+    assert items == FEED[:6]
+    assert limit_reached
+
+
+def test_crawl_resumes_from_checkpoint(tmp_path: Path) -> None:
+    checkpoint = tmp_path / "checkpoint.json"
+    pages = network.iter_pages_between_dates(
+        URL, before="9999", page_size=4, checkpoint=checkpoint
+    )
+    first_pages = [next(pages), next(pages)]
+    pages.close()  # Interrupted while processing the second page
+
+    resumed = list(
+        network.iter_items_between_dates(
+            URL, before="9999", page_size=4, checkpoint=checkpoint
+        )
+    )
+    assert first_pages[0] + resumed == FEED
+
+
+def test_checkpoint_of_another_query_is_ignored(tmp_path: Path) -> None:
+    checkpoint = tmp_path / "checkpoint.json"
+    cursor = DateCursor(
+        URL,
+        since="2000",
+        before="9999",
+        date_indicator="createDate",
+        params={"userId": 1},
+        page_size=4,
+        checkpoint=checkpoint,
+    )
+    cursor.advance(FEED[:4])
+    cursor.save()
+
+    cursor = DateCursor(
+        URL,
+        since="2000",
+        before="9999",
+        date_indicator="createDate",
+        params={"userId": 2},
+        page_size=4,
+        checkpoint=checkpoint,
+    )
+    assert cursor.before == "9999"
+    assert not cursor.seen
+
+
+def test_full_page_of_duplicates_stops() -> None:
+    cursor = DateCursor(
+        URL,
+        since="2000",
+        before="9999",
+        date_indicator="createDate",
+        params=None,
+        page_size=2,
+    )
+    same_date = [{"id": i, "createDate": "2025"} for i in range(2)]
+    assert cursor.advance(same_date) == same_date
+    assert cursor.advance(same_date) == []
+    assert cursor.next_params() is None
+
+
+def test_split_date_range() -> None:
+    ranges = network.split_date_range("2025-01-01", "2025-01-10", 3)
+    assert ranges == [
+        ("2025-01-07T00:00:00Z", "2025-01-10"),
+        ("2025-01-04T00:00:00Z", "2025-01-07T00:00:00Z"),
+        ("2025-01-01", "2025-01-04T00:00:00Z"),
+    ]
+    assert network.split_date_range("2025-01-01", "2025-01-10", 1) == [
+        ("2025-01-01", "2025-01-10")
+    ]
+
+
+def test_sharded_crawl_merges_by_decreasing_date() -> None:
+    items = network.fetch_all_items_between_dates_sharded(
+        URL, "2025-01-01", "2025-01-10", page_size=4, shards=3
+    )
+    assert items == FEED
@@ -0,0 +1,71 @@
+# ruff: noqa: S101
+import time
+from typing import Any
+
+import pytest
+
+from tests.fakes import LOCAL_URL as URL
+from tests.fakes import FakeSession
+from vdbpy.utils import network
+from vdbpy.utils.deadline import DeadlineExceededError, deadline, get_remaining_time
+from vdbpy.utils.rate_limit import TokenBucket
+
+
+class TimeoutRecordingSession(FakeSession):
+    def __init__(self, total_count: int = 0, statuses: list[int] | None = None):
+        super().__init__(total_count, statuses)
+        self.timeouts: list[float] = []
+
+    def get(self, url: str, params: dict[Any, Any] | None = None, **kwargs: Any):
+        self.timeouts.append(kwargs["timeout"])
+        return super().get(url, params)
+
+
+def test_nested_deadlines_only_shorten_the_budget() -> None:
+    assert get_remaining_time() is None
+    with deadline(1):
+        with deadline(60):
+            remaining = get_remaining_time()
+            assert remaining is not None
+            assert remaining <= 1
+        with deadline(0.5):
+            remaining = get_remaining_time()
+            assert remaining is not None
+            assert remaining <= 0.5
+    assert get_remaining_time() is None
+
+
+def test_request_timeout_is_capped_to_the_budget() -> None:
+    session = TimeoutRecordingSession(total_count=1)
+    network.fetch_json(URL, session=session)  # type: ignore
+    with deadline(2):
+        network.fetch_json(URL, session=session, params={"q": 1})  # type: ignore
+    assert session.timeouts[0] == network.BASE_TIMEOUT
+    assert session.timeouts[1] <= 2
+
+
+def test_retries_are_abandoned_when_the_backoff_outlasts_the_budget(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(network, "backoff_delay", lambda *_: 10)
+    session = FakeSession(total_count=1, statuses=[503] * 5)
+    started = time.monotonic()
+    with deadline(1), pytest.raises(DeadlineExceededError):
+        network.fetch_json(URL, session=session)  # type: ignore
+    assert time.monotonic() - started < 1
+    assert len(session.calls) == 1
+
+
+def test_spent_budget_fails_before_sending() -> None:
+    session = FakeSession(total_count=1)
+    with deadline(0), pytest.raises(TimeoutError):
+        network.fetch_json(URL, session=session)  # type: ignore
+    assert session.calls == []
+
+
+def test_rate_limiter_gives_the_token_back_instead_of_overwaiting() -> None:
+    bucket = TokenBucket(rate=1, burst=1)
+    bucket.acquire()
+    with deadline(0.2), pytest.raises(DeadlineExceededError):
+        bucket.acquire()
+    assert bucket.reserve() == pytest.approx(1, abs=0.05)
@@ -0,0 +1,63 @@
+# ruff: noqa: S101
+from collections.abc import Iterator
+from pathlib import Path
+
+import orjson
+import pytest
+
+from tests.fakes import FakeSession
+from vdbpy.utils import metrics, network
+
+
+@pytest.fixture(autouse=True)
+def _enabled_metrics(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(metrics, "_enabled", True)
+    monkeypatch.setattr(network, "backoff_delay", lambda *_: 0)
+    metrics.reset_metrics()
+    yield
+    metrics.reset_metrics()
+
+
+def test_get_endpoint_template() -> None:
+    assert (
+        metrics.get_endpoint_template("https://vocadb.net/api/songs/123/tagUsages?x=1")
+        == "/api/songs/{id}/tagUsages"
+    )
+    assert (
+        metrics.get_endpoint_template("https://vocadb.net/api/songs/") == "/api/songs"
+    )
+
+
+def test_requests_statuses_and_retries_are_recorded() -> None:
+    session = FakeSession(total_count=1, statuses=[500])
+    network.fetch_json("http://localhost/api/songs/5", session=session)  # type: ignore
+    network.fetch_json("http://localhost/api/songs/6", session=session)  # type: ignore
+
+    endpoint = metrics.get_metrics()["/api/songs/{id}"]
+    assert endpoint["requests"] == 3
+    assert endpoint["statuses"] == {"500": 1, "200": 2}
+    assert endpoint["retries"] == 1
+    assert endpoint["bytes"] > 0
+    assert 0 <= endpoint["p50_seconds"] <= endpoint["p99_seconds"]
+
+
+def test_percentile_interpolates_within_bucket() -> None:
+    for latency in [0.06] * 90 + [0.3] * 10:
+        metrics.record_request("http://localhost/api/songs", 200, latency)
+    endpoint = metrics.get_metrics()["/api/songs"]
+    assert 0.05 < endpoint["p50_seconds"] <= 0.1
+    assert 0.25 < endpoint["p99_seconds"] <= 0.5
+
+
+def test_dump_metrics(tmp_path: Path) -> None:
+    metrics.record_request("http://localhost/api/songs", 200, 0.02, 10)
+    metrics.record_wait("http://localhost/api/songs", "rate_limit", 0.5)
+
+    metrics.dump_metrics(tmp_path / "metrics.json")
+    data = orjson.loads((tmp_path / "metrics.json").read_bytes())
+    assert data["/api/songs"]["wait_seconds"] == {"rate_limit": 0.5}
+
+    metrics.dump_metrics(tmp_path / "metrics.prom")
+    text = (tmp_path / "metrics.prom").read_text()
+    assert 'vdbpy_requests_total{endpoint="/api/songs",status="200"} 1' in text
+    assert 'vdbpy_request_seconds_bucket{endpoint="/api/songs",le="+Inf"} 1' in text
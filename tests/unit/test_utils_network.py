@@ -0,0 +1,210 @@
+# ruff: noqa: S101
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import diskcache as dc
+import pytest
+import requests
+
+from tests.fakes import LOCAL_URL as URL
+from tests.fakes import ConditionalSession, FakeSession, make_response
+from vdbpy.utils import network
+from vdbpy.utils.priority import get_request_priority, request_priority
+
+
+@pytest.fixture(autouse=True)
+def _no_retry_wait(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(network, "backoff_delay", lambda *_: 0)
+
+
+def test_fetch_json_returns_empty_dict_on_404() -> None:
+    session = FakeSession(statuses=[404])
+    assert network.fetch_json(URL, session=session) == {}  # type: ignore
+
+
+def test_fetch_json_items_keeps_page_order() -> None:
+    session = FakeSession(total_count=1234)
+    items, total_count = network.fetch_json_items_with_total_count(
+        URL,
+        session=session,  # type: ignore
+        workers=8,
+    )
+    assert total_count == 1234
+    assert [item["id"] for item in items] == list(range(1234))
+    assert sorted(int(call["start"]) for call in session.calls) == list(
+        range(0, 1234, 50)
+    )
+
+
+def test_fetch_json_items_stops_at_max_results_and_limit() -> None:
+    session = FakeSession(total_count=4000)
+    items = network.fetch_json_items(URL, session=session, max_results=120)  # type: ignore
+    assert len(items) == 120
+    assert len(session.calls) == 3
+
+    session = FakeSession(total_count=4000)
+    items = network.fetch_json_items(URL, session=session, limit=75)  # type: ignore
+    assert len(items) == 75
+    assert len(session.calls) == 2
+
+
+def test_fetch_json_items_callable_limit_stops_early() -> None:
+    session = FakeSession(total_count=4000)
+    items = network.fetch_json_items(
+        URL,
+        session=session,  # type: ignore
+        limit=lambda item: item["id"] == 130,
+        workers=4,
+    )
+    assert len(items) == 130
+    # Only the in-flight window is fetched past the matching page
+    assert len(session.calls) <= 3 + 4
+
+
+def test_iter_pages_overlaps_requests() -> None:
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def fetch_page(start: int) -> list[int]:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        return [start]
+
+    pages = list(network.iter_pages(fetch_page, list(range(10)), workers=4))
+    assert pages == [[i] for i in range(10)]
+    assert max_in_flight > 1
+
+
+def test_submit_in_context_keeps_the_request_priority() -> None:
+    with (
+        ThreadPoolExecutor(max_workers=1) as executor,
+        request_priority("interactive"),
+    ):
+        future = network.submit_in_context(executor, get_request_priority)
+    assert future.result() == "interactive"
+
+
+def test_default_session_is_pooled_and_reused(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    session = network.get_default_session()
+    assert session is network.get_default_session()
+    assert session.headers["User-Agent"] == network.USER_AGENT
+    adapter = session.get_adapter("https://vocadb.net")
+    assert adapter._pool_maxsize == network.POOL_SIZE  # noqa: SLF001
+
+    fake = FakeSession(total_count=3)
+    monkeypatch.setattr(network, "_default_session", fake)
+    monkeypatch.setattr(network, "_default_session_pid", network.os.getpid())
+    assert network.fetch_json(URL)["totalCount"] == 3
+    assert len(fake.calls) == 1
+
+
+def test_iter_json_items_is_lazy() -> None:
+    session = FakeSession(total_count=4000)
+    items = network.iter_json_items(URL, session=session, prefetch=1)  # type: ignore
+    assert [next(items)["id"] for _ in range(60)] == list(range(60))
+    # First page, second page and one prefetched page at most
+    assert len(session.calls) <= 3
+    items.close()
+
+
+def test_iter_json_items_respects_max_results_and_limit() -> None:
+    session = FakeSession(total_count=4000)
+    items = list(network.iter_json_items(URL, session=session, max_results=120))  # type: ignore
+    assert [item["id"] for item in items] == list(range(120))
+
+    session = FakeSession(total_count=4000)
+    items = list(network.iter_json_items(URL, session=session, limit=75))  # type: ignore
+    assert len(items) == 75
+
+    session = FakeSession(total_count=4000)
+    items = list(
+        network.iter_json_items(
+            URL,
+            session=session,  # type: ignore
+            limit=lambda item: item["id"] == 130,
+        )
+    )
+    assert len(items) == 130
+
+
+def test_early_stop_on_first_page_stops_the_page_threads() -> None:
+    session = FakeSession(total_count=1000)
+    items = network.fetch_json_items(
+        URL,
+        session=session,  # type: ignore
+        limit=lambda item: item["id"] == 10,
+        workers=4,
+    )
+    assert len(items) == 10
+    pages = network.iter_pages(lambda start: [start], list(range(50, 1000, 50)), 4)
+    pages.close()
+    for thread in threading.enumerate():
+        if thread.name.startswith("vdbpy-pages"):
+            thread.join(timeout=1)
+            assert not thread.is_alive()
+    # The first page and the requests already sent when it arrived
+    assert len(session.calls) <= 1 + 4
+    assert list(pages) == []
+
+
+def test_fetch_json_revalidates_with_etag(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    session = ConditionalSession()
+    monkeypatch.setattr(network, "get_default_session", lambda: session)
+    monkeypatch.setattr(network, "_http_cache", dc.Cache(str(tmp_path)))
+    before = network.get_http_cache_stats()
+
+    assert network.fetch_json(URL, revalidate=True) == {"version": '"v1"'}
+    assert network.fetch_json(URL, revalidate=True) == {"version": '"v1"'}
+    assert session.calls[1] == {"If-None-Match": '"v1"'}
+
+    session.etag = '"v2"'
+    assert network.fetch_json(URL, revalidate=True) == {"version": '"v2"'}
+
+    stats = network.get_http_cache_stats()
+    assert stats.hits - before.hits == 1
+    assert stats.stores - before.stores == 2
+
+
+def test_parse_json_reads_bytes_and_raises_requests_error() -> None:
+    r = make_response(200, {"name": "初音ミク", "items": [1, 2]})
+    assert network.parse_json(r) == {"name": "初音ミク", "items": [1, 2]}
+    r._content = b"<html>"  # noqa: SLF001
+    with pytest.raises(requests.exceptions.JSONDecodeError):
+        network.parse_json(r)
+
+
+def test_download_to_file_streams_body(tmp_path: Path) -> None:
+    body = b"x" * (network.STREAM_CHUNK_SIZE * 3 + 1)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            pass
+
+    server = ThreadingHTTPServer(("localhost", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://localhost:{server.server_address[1]}/dump.json"
+        path = network.download_to_file(url, tmp_path / "dump.json")
+    finally:
+        server.shutdown()
+    assert path.read_bytes() == body
+    assert not (tmp_path / "dump.json.part").exists()
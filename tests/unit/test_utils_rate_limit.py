@@ -0,0 +1,158 @@
+# ruff: noqa: S101
+import os
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from pathlib import Path
+
+import pytest
+
+from tests.fakes import FakeSession
+from vdbpy.utils import network
+from vdbpy.utils.priority import (
+    AGING_SECONDS,
+    RequestPriority,
+    default_request_priority,
+    get_request_priority,
+    request_priority,
+)
+from vdbpy.utils.rate_limit import (
+    SharedTokenBucket,
+    TokenBucket,
+    configure_rate_limit,
+    get_rate_limiter,
+    get_shared_rate_limit_stats,
+    parse_retry_after,
+)
+
+
+def test_token_bucket_allows_burst_then_spaces_requests() -> None:
+    bucket = TokenBucket(rate=10, burst=3)
+    waits = [bucket.reserve() for _ in range(5)]
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3] == pytest.approx(0.1, abs=0.01)
+    assert waits[4] == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_refills_over_time() -> None:
+    bucket = TokenBucket(rate=100, burst=1)
+    assert bucket.reserve() == 0
+    time.sleep(0.02)
+    assert bucket.reserve() == 0
+
+
+def test_token_bucket_penalize_and_reward() -> None:
+    bucket = TokenBucket(rate=10, burst=5)
+    bucket.penalize(retry_after=2)
+    assert bucket.rate == 5
+    assert bucket.reserve() == pytest.approx(2, abs=0.05)
+    for _ in range(100):
+        bucket.reward()
+    assert bucket.rate == 10
+
+
+def test_interactive_requests_skip_queued_bulk_requests() -> None:
+    bucket = TokenBucket(rate=10, burst=1)
+    bucket.acquire()
+    served: list[str] = []
+
+    def acquire(name: str, priority: RequestPriority) -> None:
+        with request_priority(priority):
+            bucket.acquire()
+        served.append(name)
+
+    threads = [
+        threading.Thread(target=acquire, args=(f"bulk-{i}", "bulk")) for i in range(3)
+    ]
+    threads.append(threading.Thread(target=acquire, args=("lookup", "interactive")))
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join()
+    assert served == ["bulk-0", "lookup", "bulk-1", "bulk-2"]
+
+
+def test_waiting_requests_age_into_better_priorities() -> None:
+    bucket = TokenBucket()
+    with request_priority("bulk"):
+        bulk = bucket._enqueue(lambda: None)  # noqa: SLF001 # Takes the free turn
+        bulk = bucket._enqueue(lambda: None)  # noqa: SLF001
+    with request_priority("normal"):
+        normal = bucket._enqueue(lambda: None)  # noqa: SLF001
+    assert bulk is not None
+    assert normal is not None
+    now = normal.queued_at
+    assert bulk.sort_key(now) > normal.sort_key(now)
+    assert bulk.sort_key(now + AGING_SECONDS * 1.5) < normal.sort_key(now)
+
+
+def test_default_request_priority_keeps_the_callers_choice() -> None:
+    assert get_request_priority() == "normal"
+    with default_request_priority("bulk"):
+        assert get_request_priority() == "bulk"
+    with request_priority("interactive"), default_request_priority("bulk"):
+        assert get_request_priority() == "interactive"
+
+
+def test_parse_retry_after() -> None:
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after("soon") is None
+    retry_date = datetime.now(UTC) + timedelta(seconds=30)
+    assert parse_retry_after(format_datetime(retry_date, usegmt=True)) == (
+        pytest.approx(30, abs=2)
+    )
+
+
+def test_localhost_is_not_rate_limited() -> None:
+    assert get_rate_limiter("http://localhost:5000/api/songs") is None
+    limiter = get_rate_limiter("https://vocadb.net/api/songs")
+    assert limiter is get_rate_limiter("https://vocadb.net/api/artists")
+
+
+def test_fetch_with_retries_honors_retry_after(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    url = "https://rate-limit.test/api/songs"
+    configure_rate_limit("rate-limit.test", rate=1000, burst=10)
+    monkeypatch.setattr(network, "backoff_delay", lambda *_: 60)
+    session = FakeSession(total_count=1, statuses=[429])
+    original_get = session.get
+
+    def get_with_header(*args, **kwargs):
+        r = original_get(*args, **kwargs)
+        r.headers["Retry-After"] = "0.1"
+        return r
+
+    monkeypatch.setattr(session, "get", get_with_header)
+    started = time.monotonic()
+    data = network.fetch_json(url, session=session)  # type: ignore
+    elapsed = time.monotonic() - started
+    assert data["totalCount"] == 1
+    assert 0.1 <= elapsed < 5
+    limiter = get_rate_limiter(url)
+    assert limiter is not None
+    assert limiter.rate < 1000
+
+
+def test_shared_token_bucket_shares_budget(tmp_path: Path) -> None:
+    first = SharedTokenBucket("vocadb.test", rate=10, burst=2, directory=tmp_path)
+    second = SharedTokenBucket("vocadb.test", rate=10, burst=2, directory=tmp_path)
+    assert first.reserve() == 0
+    assert second.reserve() == 0
+    assert first.reserve() == pytest.approx(0.1, abs=0.02)
+
+    second.penalize(retry_after=5)
+    assert first.reserve() == pytest.approx(5, abs=0.1)
+    assert first.rate == 5
+
+
+def test_shared_rate_limit_stats(tmp_path: Path) -> None:
+    bucket = SharedTokenBucket("vocadb.test", rate=10, burst=1, directory=tmp_path)
+    bucket.reserve()
+    bucket.reserve()
+    stats = get_shared_rate_limit_stats("vocadb.test", directory=tmp_path)
+    assert stats[os.getpid()].grants == 2
+    assert stats[os.getpid()].waits == 1
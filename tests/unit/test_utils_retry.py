@@ -0,0 +1,101 @@
+# ruff: noqa: S101
+import time
+from typing import Any
+
+import pytest
+import requests
+
+from tests.fakes import LOCAL_URL as URL
+from tests.fakes import FakeSession
+from vdbpy.utils import network
+from vdbpy.utils.deadline import DeadlineExceededError
+from vdbpy.utils.retry import (
+    BACKOFF_CAP,
+    CircuitBreaker,
+    CircuitOpenError,
+    backoff_delay,
+    get_circuit_breaker,
+    get_retry_metrics,
+)
+
+
+@pytest.fixture(autouse=True)
+def _no_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(network, "backoff_delay", lambda *_: 0)
+
+
+def test_backoff_delay_grows_with_jitter() -> None:
+    for attempt in range(1, 5):
+        delay = 2 ** (attempt - 1)
+        assert delay / 2 <= backoff_delay(attempt) <= delay
+    assert backoff_delay(100) <= BACKOFF_CAP
+
+
+def test_circuit_breaker_opens_and_half_opens() -> None:
+    breaker = CircuitBreaker("vocadb.test", failure_threshold=2, reset_timeout=0.05)
+    breaker.before_request()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    time.sleep(0.06)
+    breaker.before_request()  # Probe
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_request()
+
+
+def test_client_errors_are_not_retried() -> None:
+    session = FakeSession(statuses=[400, 200])
+    with pytest.raises(requests.exceptions.HTTPError):
+        network.fetch_json(URL, session=session)  # type: ignore
+    assert len(session.calls) == 1
+    assert get_retry_metrics()["localhost"].fail_fast == 1
+
+
+def test_circuit_opens_during_outage() -> None:
+    session = FakeSession(statuses=[500] * 20)
+    with pytest.raises(CircuitOpenError):
+        network.fetch_with_retries(URL, "get", session=session, max_retries=10)  # type: ignore
+    assert len(session.calls) == 5
+    with pytest.raises(CircuitOpenError):
+        network.fetch_json(URL, session=session)  # type: ignore
+    assert len(session.calls) == 5
+
+    metrics = get_retry_metrics()["localhost"]
+    assert metrics.failures["server_error"] == 5
+    assert metrics.retries == 4
+    assert metrics.circuit_opens == 1
+    assert metrics.short_circuits == 2
+
+
+def test_probe_without_outcome_is_released(monkeypatch: pytest.MonkeyPatch) -> None:
+    breaker = get_circuit_breaker(URL)
+    breaker.reset_timeout = 0
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert breaker.state == "open"
+
+    def send_request(*_: Any) -> requests.Response:
+        msg = "Deadline exceeded"
+        raise DeadlineExceededError(msg)
+
+    with monkeypatch.context() as m:
+        m.setattr(network, "send_request", send_request)
+        with pytest.raises(DeadlineExceededError):
+            network.fetch_json(URL)
+    assert breaker.state == "half_open"
+
+    session = FakeSession(total_count=1)
+    assert network.fetch_json(URL, session=session)["totalCount"] == 1
+    assert breaker.state == "closed"
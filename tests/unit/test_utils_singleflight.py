@@ -0,0 +1,106 @@
+# ruff: noqa: S101
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+
+from tests.fakes import LOCAL_URL as URL
+from tests.fakes import FakeSession
+from vdbpy.utils import network
+from vdbpy.utils.deadline import DeadlineExceededError, check_deadline, deadline
+from vdbpy.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    flight = SingleFlight()
+    executions = 0
+    release = threading.Event()
+
+    def slow() -> dict[str, int]:
+        nonlocal executions
+        executions += 1
+        release.wait()
+        return {"value": 1}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flight.do, "key", slow) for _ in range(4)]
+        while flight.stats.calls < 4:
+            time.sleep(0.001)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert executions == 1
+    assert results == [{"value": 1}] * 4
+    # Waiting callers get copies
+    assert len({id(result) for result in results}) == 4
+    assert flight.stats.executions == 1
+    assert flight.stats.shared == 3
+
+
+def test_exception_is_shared_and_key_released() -> None:
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def failing() -> None:
+        release.wait()
+        msg = "boom"
+        raise ValueError(msg)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(flight.do, "key", failing) for _ in range(2)]
+        while flight.stats.calls < 2:
+            time.sleep(0.001)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError, match="boom"):
+                future.result()
+
+    assert flight.do("key", lambda: 2) == 2
+
+
+def test_follower_takes_over_when_the_leaders_deadline_runs_out() -> None:
+    flight = SingleFlight()
+    executions = 0
+
+    def slow() -> int:
+        nonlocal executions
+        executions += 1
+        time.sleep(0.1)
+        check_deadline()
+        return executions
+
+    def lead() -> int:
+        with deadline(0.05):
+            return flight.do("key", slow)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(lead)
+        while flight.stats.calls < 1:
+            time.sleep(0.001)
+        follower = executor.submit(flight.do, "key", slow)
+        with pytest.raises(DeadlineExceededError):
+            leader.result()
+        assert follower.result() == 2
+    assert flight.stats.executions == 2
+    assert flight.stats.shared == 0
+
+
+class SlowSession(FakeSession):
+    def get(self, url: str, params: dict[Any, Any] | None = None, **kwargs: Any):
+        time.sleep(0.05)
+        return super().get(url, params, **kwargs)
+
+
+def test_fetch_json_coalesces_identical_requests() -> None:
+    session = SlowSession(total_count=3)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(
+                lambda _: network.fetch_json(URL, session, {"start": 0}),  # type: ignore
+                range(4),
+            )
+        )
+    assert all(result["totalCount"] == 3 for result in results)
+    assert len(session.calls) == 1
@@ -1,4 +1,5 @@
 import json
+from collections.abc import Iterator
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from typing import Any
@@ -15,9 +16,14 @@ from vdbpy.utils.data import (
     user_edit_from_dict,
 )
 from vdbpy.utils.date import parse_date
-from vdbpy.utils.files import get_text, save_file
+from vdbpy.utils.files import get_lines, get_text, save_file
 from vdbpy.utils.logger import get_logger
-from vdbpy.utils.network import fetch_all_items_between_dates, fetch_json
+from vdbpy.utils.network import (
+    fetch_all_items_between_dates,
+    fetch_all_items_between_dates_sharded,
+    fetch_json,
+    iter_pages_between_dates,
+)
 
 logger = get_logger()
 
@@ -372,32 +378,138 @@ def get_monthly_edit_count(year: int, month: int) -> int:
     return get_monthly_count(year, month, ACTIVITY_API_URL)
 
 
-def get_created_entries_by_username(username: str) -> list[UserEdit]:
+def iter_edits_by_user_id(
+    user_id: int,
+    params: dict[str, Any] | None = None,
+    checkpoint: Path | None = None,
+    *,
+    since: str = "2000-01-01T00:00:00Z",
+    before: str = "2100-01-01T00:00:00Z",
+) -> Iterator[list[UserEdit]]:
+    """Yield the user's edits page by page, from the newest to the oldest.
+
+    With a checkpoint file an interrupted crawl continues after the last page
+    that was yielded and processed.
+    """
+    params = {"userId": user_id, "fields": "Entry,ArchivedVersion", **(params or {})}
+    for page in iter_pages_between_dates(
+        ACTIVITY_API_URL,
+        since,
+        before,
+        params=params,
+        page_size=500,
+        checkpoint=checkpoint,
+    ):
+        yield parse_edits(page)
+
+
+def _get_edits_by_user_id(
+    user_id: int,
+    params: dict[str, Any],
+    save_dir: Path | None,
+    slug: str,
+    shards: int = 1,
+    *,
+    since: str = "2000-01-01T00:00:00Z",
+    before: str = "2100-01-01T00:00:00Z",
+) -> list[UserEdit]:
+    if shards > 1:
+        if save_dir:
+            msg = "Sharded crawls can't be resumed, use either save_dir or shards"
+            raise ValueError(msg)
+        params = {"userId": user_id, "fields": "Entry,ArchivedVersion", **params}
+        return parse_edits(
+            fetch_all_items_between_dates_sharded(
+                ACTIVITY_API_URL,
+                since,
+                before,
+                params=params,
+                page_size=500,
+                shards=shards,
+            )
+        )
+    if not save_dir:
+        return [
+            edit
+            for page in iter_edits_by_user_id(
+                user_id, params, since=since, before=before
+            )
+            for edit in page
+        ]
+
+    # Edits are appended once per page, so a crash repeats at most one page.
+    # The date range is in the names, so a retry with another range starts over.
+    date_range = "_".join(
+        date.replace("-", "").replace(":", "") for date in (since, before)
+    )
+    prefix = f"{slug}-{user_id}-{date_range}{PARTIAL_SLUG}"
+    partial_filename = save_dir / f"{prefix}.jsonl"
+    checkpoint = save_dir / f"{prefix}-checkpoint.json"
+    save_dir.mkdir(parents=True, exist_ok=True)
+    for page in iter_edits_by_user_id(
+        user_id, params, checkpoint, since=since, before=before
+    ):
+        with partial_filename.open("a", encoding="utf8") as f:
+            f.writelines(
+                json.dumps(edit, cls=UserEditJSONEncoder) + "\n" for edit in page
+            )
+
+    edits: list[UserEdit] = []
+    seen: set[tuple[EntryType, int]] = set()
+    for line in get_lines(partial_filename):
+        edit = user_edit_from_dict(json.loads(line))
+        if (edit.entry_type, edit.version_id) not in seen:
+            seen.add((edit.entry_type, edit.version_id))
+            edits.append(edit)
+    # The checkpoint goes first: without the data, a finished one would be empty
+    logger.debug(f"Removing {checkpoint} and {partial_filename}")
+    checkpoint.unlink(missing_ok=True)
+    partial_filename.unlink()
+    return edits
+
+
+def get_created_entries_by_username(
+    username: str,
+    save_dir: Path | None = None,
+    shards: int = 1,
+    *,
+    since: str = "2000-01-01T00:00:00Z",
+    before: str = "2100-01-01T00:00:00Z",
+) -> list[UserEdit]:
     # Also includes deleted entries
     username, user_id = find_user_by_username_1d(username)
-    params = {
-        "userId": user_id,
-        "fields": "Entry,ArchivedVersion",
-        "editEvent": "Created",
-    }
-
     logger.debug(f"Fetching created entries by user '{username}' ({user_id})")
-    return parse_edits(
-        fetch_all_items_between_dates(ACTIVITY_API_URL, params=params, page_size=500)[0]
+    return _get_edits_by_user_id(
+        user_id,
+        {"editEvent": "Created"},
+        save_dir,
+        "created-entries",
+        shards,
+        since=since,
+        before=before,
     )
 
 
-def get_edits_by_username(username: str) -> list[UserEdit]:
+def get_edits_by_username(
+    username: str,
+    save_dir: Path | None = None,
+    shards: int = 1,
+    *,
+    since: str = "2000-01-01T00:00:00Z",
+    before: str = "2100-01-01T00:00:00Z",
+) -> list[UserEdit]:
+    """Fetch the user's edits made from `since` to `before`.
+
+    With `save_dir`, progress is saved after every page and an interrupted
+    crawl resumes where it stopped. With `shards`, [since, before) is split
+    into equally long date ranges that are crawled concurrently, so `since`
+    should be close to the user's first edit for the shards to be balanced.
+    """
     # Also includes deleted entries
     username, user_id = find_user_by_username_1d(username)
-    params = {
-        "userId": user_id,
-        "fields": "Entry,ArchivedVersion",
-    }
-
     logger.debug(f"Fetching edits by user '{username}' ({user_id})")
-    return parse_edits(
-        fetch_all_items_between_dates(ACTIVITY_API_URL, params=params, page_size=500)[0]
+    return _get_edits_by_user_id(
+        user_id, {}, save_dir, "edits", shards, since=since, before=before
     )
 
 
@@ -416,7 +528,7 @@ def get_edits_by_entry(
 ) -> list[UserEdit]:
     url = get_versions_url(entry_type, entry_id)
     logger.debug(f"   Downloading version history {url}")
-    data = fetch_json(url)
+    data = fetch_json(url, revalidate=True)
     if not include_deleted:
         if entry_type in ["Album", "Tag", "ReleaseEvent", "ReleaseEventSeries"]:
             if is_entry_deleted(entry_type, entry_id):
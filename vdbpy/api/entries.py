@@ -1,4 +1,7 @@
 import random
+from collections.abc import Collection, Generator, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
 from pathlib import Path
 from typing import Any, get_args
 
@@ -21,6 +24,7 @@ from vdbpy.types.albums import AlbumVersion
 from vdbpy.types.artists import ArtistVersion
 from vdbpy.types.events import ReleaseEventVersion
 from vdbpy.types.mappings import (
+    api_urls_by_entry_type,
     entry_type_to_url,
     entry_types_by_api_url,
     entry_url_to_type,
@@ -38,11 +42,14 @@ from vdbpy.utils.data import add_s
 from vdbpy.utils.files import get_lines, save_file
 from vdbpy.utils.logger import get_logger
 from vdbpy.utils.network import (
+    PAGE_WORKERS,
     fetch_cached_total_count,
     fetch_json,
     fetch_json_items,
     fetch_total_count,
+    submit_in_context,
 )
+from vdbpy.utils.priority import default_request_priority
 
 logger = get_logger()
 
@@ -51,7 +58,7 @@ type EntryDetails = dict[Any, Any]  # TODO implement
 
 def get_entry_details(entry_type: EntryType, entry_id: int) -> EntryDetails:
     url = f"{WEBSITE}/api/{add_s(entry_type)}/{entry_id}/details"
-    return fetch_json(url)
+    return fetch_json(url, revalidate=True)
 
 
 def get_entry_tag_ids(entry_type: EntryType, entry_id: int) -> list[int]:
@@ -123,7 +130,56 @@ def get_cached_entry_version(  # noqa: PLR0911
             raise ValueError(msg)
 
 
-# TODO get entry
+@cache_with_expiration(days=7)
+def get_cached_raw_entry(
+    entry_type: EntryType, entry_id: int, fields: str = ""
+) -> dict[Any, Any]:
+    url = f"{api_urls_by_entry_type[entry_type]}/{entry_id}"
+    return fetch_json(url, params={"fields": fields} if fields else None)
+
+
+def get_entries_by_ids(
+    entry_type: EntryType,
+    entry_ids: Iterable[int],
+    fields: Collection[str] | None = None,
+    workers: int = PAGE_WORKERS,
+) -> Generator[tuple[int, dict[Any, Any] | Exception]]:
+    """Yield (entry id, entry) once per distinct id, in order of completion.
+
+    Entries are read from the 7-day cache of get_cached_raw_entry, and the
+    misses are fetched by `workers` threads as bulk requests under the rate
+    limiter. A failed fetch yields its exception instead of the entry without
+    stopping the others. Missing entries are returned as {}.
+    """
+    fields_param = ",".join(sorted(fields)) if fields else ""
+    ids = iter(dict.fromkeys(entry_ids))
+
+    def fetch(entry_id: int) -> dict[Any, Any]:
+        with default_request_priority("bulk"):
+            return get_cached_raw_entry(entry_type, entry_id, fields_param)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vdbpy-ids")
+
+    def submit(entry_id: int) -> Future[dict[Any, Any]]:
+        return submit_in_context(executor, fetch, entry_id)
+
+    pending = {submit(entry_id): entry_id for entry_id in islice(ids, workers * 2)}
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                entry_id = pending.pop(future)
+                if (next_id := next(ids, None)) is not None:
+                    pending[submit(next_id)] = next_id
+                try:
+                    entry = future.result()
+                except Exception as e:  # noqa: BLE001
+                    logger.warning(f"Couldn't fetch {entry_type} {entry_id}: {e}")
+                    yield entry_id, e
+                else:
+                    yield entry_id, entry
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 def get_cached_entry_count_by_entry_type(entry_type: EntryType) -> int:
@@ -1,12 +1,13 @@
 import dataclasses
 import random
+from collections.abc import Collection
 from typing import Any
 
 import requests
 
 from vdbpy.api.edits import get_edits_by_entry
 from vdbpy.config import SONG_API_URL, SONGLIST_API_URL, USER_API_URL
-from vdbpy.parsers.songs import parse_song
+from vdbpy.parsers.songs import get_song_fields_for_projection, parse_song
 from vdbpy.types.shared import (
     Service,
 )
@@ -36,19 +37,35 @@ def get_json_songs_with_total_count(
     )
 
 
+def _resolve_song_fields(
+    fields: set[OptionalSongFieldName] | None, projection: Collection[str] | None
+) -> set[OptionalSongFieldName] | None:
+    """Add the optional fields needed by a projection to the requested fields."""
+    if projection is None:
+        return fields
+    return (fields or set()) | get_song_fields_for_projection(projection)
+
+
 def get_songs_with_total_count(
     fields: set[OptionalSongFieldName] | None = None,
     song_search_params: SongSearchParams | None = None,
     session: requests.Session | None = None,
+    projection: Collection[str] | None = None,
 ) -> tuple[list[SongEntry], int]:
+    """Search songs with the optional `fields`.
+
+    With a `projection` (the SongEntry attributes the caller reads), only the
+    optional fields needed for those attributes are requested and parsed.
+    """
     params: dict[str, str | int | list[str]] = {}
+    fields = _resolve_song_fields(fields, projection)
 
     logger.debug("Fetching songs with total count:")
     logger.debug(f"Got song search params {song_search_params}")
     logger.debug(f"Got fields {fields}")
 
     if fields:
-        params["fields"] = ",".join(fields)
+        params["fields"] = ",".join(sorted(fields))
 
     if song_search_params:
         # Verify search param usage
@@ -98,15 +115,21 @@ def get_songs(
     song_search_params: SongSearchParams | None = None,
     fields: set[OptionalSongFieldName] | None = None,
     session: requests.Session | None = None,
+    projection: Collection[str] | None = None,
 ) -> list[SongEntry]:
-    return get_songs_with_total_count(fields, song_search_params, session=session)[0]
+    return get_songs_with_total_count(
+        fields, song_search_params, session=session, projection=projection
+    )[0]
 
 
 def get_song_by_id(
-    song_id: int, fields: set[OptionalSongFieldName] | None = None
+    song_id: int,
+    fields: set[OptionalSongFieldName] | None = None,
+    projection: Collection[str] | None = None,
 ) -> SongEntry:
     url = f"{SONG_API_URL}/{song_id}"
-    params = {"fields": ",".join(fields)} if fields else {}
+    fields = _resolve_song_fields(fields, projection)
+    params = {"fields": ",".join(sorted(fields))} if fields else {}
     return parse_song(fetch_json(url, params=params), fields=fields)
 
 
@@ -136,14 +159,18 @@ def get_cached_song_by_entry_id_and_version_id(
 
 
 def get_song_by_pv(
-    pv_service: Service, pv_id: str, fields: set[OptionalSongFieldName] | None = None
+    pv_service: Service,
+    pv_id: str,
+    fields: set[OptionalSongFieldName] | None = None,
+    projection: Collection[str] | None = None,
 ) -> SongEntry | None:
     params = {
         "pvService": pv_service,
         "pvId": pv_id,
     }
+    fields = _resolve_song_fields(fields, projection)
     if fields:
-        params["fields"] = ",".join(fields)
+        params["fields"] = ",".join(sorted(fields))
     entry = fetch_json(f"{SONG_API_URL}/byPv", params=params)
     return parse_song(entry, fields=fields) if entry else None
 
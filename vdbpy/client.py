@@ -0,0 +1,140 @@
+"""VocaDB instances to send requests to, selected per thread or async task.
+
+    beta = VDBClient("https://beta.vocadb.net", rate=1)
+    with beta.use():
+        song = get_song_by_id(song_id)  # Sent to beta.vocadb.net
+
+The API functions build their URLs from the constants in vdbpy.config. Within
+`client.use()`, URLs under the configured WEBSITE are sent to the client's
+website instead, through the client's own session pool and rate limit
+budget, and cached results are kept in the client's cache namespace. Outside
+of any block, requests go through the default client built from
+VDBPY_WEBSITE, so the module functions behave as before.
+
+The client follows the pages fetched by the pagination helpers into their
+worker threads, so clients for several instances can be used in parallel.
+"""
+
+import os
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+from vdbpy.config import WEBSITE
+
+if TYPE_CHECKING:
+    from requests import Session
+
+    from vdbpy.utils.rate_limit import TokenBucket
+
+
+class VDBClient:
+    def __init__(
+        self,
+        website: str = WEBSITE,
+        *,
+        rate: float | None = None,
+        burst: float | None = None,
+        cache_namespace: str | None = None,
+        pool_size: int | None = None,
+    ):
+        """Create a client for a VocaDB instance.
+
+        Without `rate`, the client shares the per-host rate limit budget of
+        vdbpy.utils.rate_limit. The cache namespace defaults to the host for
+        instances other than the configured WEBSITE.
+        """
+        self.website = website.rstrip("/")
+        self.host = urlparse(self.website).netloc
+        if cache_namespace is None:
+            cache_namespace = "" if self.website == WEBSITE else self.host
+        self.cache_namespace = cache_namespace
+        self.rate = rate
+        self.burst = burst
+        self.pool_size = pool_size
+        self._limiter: TokenBucket | None = None
+        self._session: Session | None = None
+        self._session_pid = 0
+        self._lock = threading.Lock()
+
+    @property
+    def is_default(self) -> bool:
+        return self is _default_client
+
+    def api_url(self, path: str) -> str:
+        """Return the URL of an API path such as "songs" or "users/1"."""
+        return f"{self.website}/api/{path.lstrip('/')}"
+
+    def resolve_url(self, url: str) -> str:
+        """Move a URL under the configured WEBSITE to this client's website.
+
+        URLs already under the client's website are returned as they are, so
+        a website below WEBSITE such as f"{WEBSITE}/mirror" is added only once.
+        """
+        if self.website == WEBSITE:
+            return url
+        if url == self.website or url.startswith(f"{self.website}/"):
+            return url
+        if url == WEBSITE or url.startswith(f"{WEBSITE}/"):
+            return self.website + url.removeprefix(WEBSITE)
+        return url
+
+    def get_session(self) -> "Session":
+        """Return the client's pooled session, recreated in forked processes.
+
+        The default client uses the module-level session of vdbpy.utils.network.
+        """
+        from vdbpy.utils.network import (  # noqa: PLC0415
+            POOL_SIZE,
+            create_session,
+            get_default_session,
+        )
+
+        if self.is_default:
+            return get_default_session()
+        with self._lock:
+            if self._session is None or self._session_pid != os.getpid():
+                self._session = create_session(self.pool_size or POOL_SIZE)
+                self._session_pid = os.getpid()
+            return self._session
+
+    def get_rate_limiter(self, url: str) -> "TokenBucket | None":
+        """Return the limiter for a URL: the client's own budget for its host."""
+        from vdbpy.utils.rate_limit import (  # noqa: PLC0415
+            DEFAULT_BURST,
+            TokenBucket,
+            get_rate_limiter,
+        )
+
+        limiter = get_rate_limiter(url)
+        if limiter is None or self.rate is None or urlparse(url).netloc != self.host:
+            return limiter
+        with self._lock:
+            if self._limiter is None:
+                self._limiter = TokenBucket(self.rate, self.burst or DEFAULT_BURST)
+            return self._limiter
+
+    @contextmanager
+    def use(self) -> Generator["VDBClient"]:
+        """Send the requests made in the block through this client."""
+        token = _client.set(self)
+        try:
+            yield self
+        finally:
+            _client.reset(token)
+
+
+_default_client = VDBClient()
+_client: ContextVar[VDBClient | None] = ContextVar("vdbpy_client", default=None)
+
+
+def get_default_client() -> VDBClient:
+    return _default_client
+
+
+def get_client() -> VDBClient:
+    """Return the client of the current `use()` block, or the default client."""
+    return _client.get() or _default_client
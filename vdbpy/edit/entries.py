@@ -8,7 +8,7 @@ from vdbpy.types.mappings import api_urls_by_entry_type
 from vdbpy.types.shared import EntryTuple, Service
 from vdbpy.utils.console import get_boolean
 from vdbpy.utils.logger import get_logger
-from vdbpy.utils.network import fetch_with_retries
+from vdbpy.utils.network import fetch_with_retries, parse_json
 
 logger = get_logger()
 
@@ -170,7 +170,7 @@ def edit_entry(
     entry_type, entry_id = entry
     api_url = f"{api_urls_by_entry_type[entry_type]}/{entry_id}"
     url = f"{api_url}/for-edit"
-    entry_data = fetch_with_retries(url=url, verb="get", session=session).json()
+    entry_data = parse_json(fetch_with_retries(url=url, verb="get", session=session))
     logger.debug(f"{entry_data=}")
     fixed_data = edit_function(entry_data, base_update_note, args)
     if not fixed_data:
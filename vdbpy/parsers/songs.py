@@ -1,3 +1,5 @@
+import dataclasses
+from collections.abc import Collection
 from typing import Any
 
 from vdbpy.parsers.albums import parse_song_albums
@@ -14,6 +16,7 @@ from vdbpy.parsers.shared import (
 )
 from vdbpy.parsers.tags import parse_tag
 from vdbpy.types.songs import (
+    SONG_ATTRIBUTE_FIELDS,
     Lyrics,
     OptionalSongFieldName,
     OptionalSongFields,
@@ -49,6 +52,24 @@ def parse_languages(data: dict[Any, Any]) -> list[str]:
     return lang_codes
 
 
+def get_song_fields_for_projection(
+    projection: Collection[str],
+) -> set[OptionalSongFieldName]:
+    """Return the optional fields needed to read the given SongEntry attributes.
+
+    Attributes outside of the optional fields are always returned.
+    """
+    unknown = set(projection) - {field.name for field in dataclasses.fields(SongEntry)}
+    if unknown:
+        msg = f"Unknown song attributes in projection: {sorted(unknown)}"
+        raise ValueError(msg)
+    return {
+        SONG_ATTRIBUTE_FIELDS[attribute]
+        for attribute in projection
+        if attribute in SONG_ATTRIBUTE_FIELDS
+    }
+
+
 def parse_optional_song_fields(
     data: dict[Any, Any], fields: set[OptionalSongFieldName] | None = None
 ) -> OptionalSongFields:
@@ -0,0 +1,378 @@
+"""Local stand-in for the VocaDB REST API, answering from the dump database.
+
+    python -m vdbpy.serve --port 8000
+    VDBPY_WEBSITE=http://localhost:8000 python script.py
+
+Only the endpoints used for load testing are implemented: song search and
+details, artist search and tag details. Paging follows the API (`start`,
+`maxResults`, `getTotalCount`). Fields missing from the dump, such as ratings
+and version numbers, are filled with placeholders.
+"""
+
+import argparse
+import re
+from collections import defaultdict
+from collections.abc import Callable
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+import orjson
+from sqlalchemy import Select, desc, func, select
+from sqlalchemy.orm import Session
+
+from vdbpy.utils.dump_sql import DumpDB, EntryTranslatedName
+from vdbpy.utils.logger import get_logger
+
+logger = get_logger()
+
+MAX_RESULTS = 100
+PLACEHOLDER_DATE = "2000-01-01T00:00:00Z"
+
+type Query = dict[str, list[str]]
+
+
+def _get_param(query: Query, name: str, default: str = "") -> str:
+    return query.get(name, [default])[0]
+
+
+def _get_ids(query: Query, name: str) -> list[int]:
+    """Read `name[]=1&name[]=2`, `name=1&name=2` and `name=1,2` alike."""
+    values = query.get(f"{name}[]", []) + query.get(name, [])
+    return [int(v) for value in values for v in value.split(",") if v]
+
+
+def _get_fields(query: Query) -> set[str]:
+    return {
+        field.strip().lower()
+        for field in _get_param(query, "fields").split(",")
+        if field.strip()
+    }
+
+
+class DumpApi:
+    """Builds API responses for the songs, artists and tags in the dump."""
+
+    def __init__(self, db: DumpDB):
+        self.db = db
+
+    def _session(self) -> Session:
+        return Session(self.db.engine)
+
+    def _names(
+        self, entry_type: str, ids: list[int]
+    ) -> dict[int, tuple[str | None, str | None]]:
+        stmt = select(
+            EntryTranslatedName.entry_id,
+            EntryTranslatedName.default_name,
+            EntryTranslatedName.default_language,
+        ).where(
+            EntryTranslatedName.entry_type == entry_type,
+            EntryTranslatedName.entry_id.in_(ids),
+        )
+        with self._session() as session:
+            rows = session.execute(stmt).all()
+        return {entry_id: (name, language) for entry_id, name, language in rows}
+
+    def _tags(self, entry_type: str, ids: list[int]) -> dict[int, list[Any]]:
+        tags: dict[int, list[Any]] = defaultdict(list)
+        stmt = select(
+            DumpDB.EntryTag.entry_id,
+            DumpDB.EntryTag.tag_id,
+            DumpDB.EntryTag.count,
+            DumpDB.EntryTag.tag_name_hint,
+        ).where(
+            DumpDB.EntryTag.entry_type == entry_type,
+            DumpDB.EntryTag.entry_id.in_(ids),
+        )
+        with self._session() as session:
+            rows = session.execute(stmt).all()
+        for entry_id, tag_id, count, name_hint in rows:
+            tag = {"id": tag_id, "name": name_hint or "", "urlSlug": ""}
+            tags[entry_id].append({"count": count, "tag": tag})
+        return tags
+
+    def _page(
+        self,
+        stmt: Select[Any],
+        query: Query,
+        to_contracts: Callable[[list[Any], set[str]], list[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        start = int(_get_param(query, "start", "0"))
+        max_results = min(int(_get_param(query, "maxResults", "10")), MAX_RESULTS)
+        total_count = 0
+        with self._session() as session:
+            rows = list(session.scalars(stmt.offset(start).limit(max_results)))
+            if _get_param(query, "getTotalCount").lower() == "true":
+                count_stmt = select(func.count()).select_from(
+                    stmt.order_by(None).subquery()
+                )
+                total_count = session.scalar(count_stmt) or 0
+        return {
+            "items": to_contracts(rows, _get_fields(query)),
+            "totalCount": total_count,
+        }
+
+    # -------------------- songs -------------------- #
+
+    def _song_contracts(
+        self, rows: list[Any], fields: set[str]
+    ) -> list[dict[str, Any]]:
+        ids = [row.id for row in rows]
+        names = self._names("Song", ids)
+        artists: dict[int, list[Any]] = defaultdict(list)
+        pv_services: dict[int, set[str]] = defaultdict(set)
+        with self._session() as session:
+            for artist in session.scalars(
+                select(DumpDB.SongArtist).where(DumpDB.SongArtist.song_id.in_(ids))
+            ):
+                artists[artist.song_id].append(artist)
+            for song_id, service in session.execute(
+                select(DumpDB.SongPV.song_id, DumpDB.SongPV.service).where(
+                    DumpDB.SongPV.song_id.in_(ids), DumpDB.SongPV.disabled == 0
+                )
+            ):
+                pv_services[song_id].add(service)
+        tags = self._tags("Song", ids) if "tags" in fields else {}
+
+        contracts: list[dict[str, Any]] = []
+        for row in rows:
+            default_name, language = names.get(row.id, (None, None))
+            song_artists = artists[row.id]
+            contract: dict[str, Any] = {
+                "id": row.id,
+                "name": row.name_en or default_name or "",
+                "defaultName": default_name or row.name_en or "",
+                "defaultNameLanguage": language or "Unspecified",
+                "songType": row.song_type,
+                "lengthSeconds": row.length_seconds or 0,
+                "artistString": ", ".join(
+                    a.name_hint or "" for a in song_artists if not a.is_support
+                ),
+                "pvServices": ", ".join(sorted(pv_services[row.id])) or "Nothing",
+                "createDate": row.publish_date or PLACEHOLDER_DATE,
+                "favoritedTimes": 0,
+                "ratingScore": 0,
+                "status": "Finished",
+                "version": 0,
+            }
+            if row.publish_date:
+                contract["publishDate"] = row.publish_date
+            if row.original_id:
+                contract["originalVersionId"] = row.original_id
+            if "tags" in fields:
+                contract["tags"] = tags[row.id]
+            if "artists" in fields:
+                contract["artists"] = [
+                    {
+                        "id": a.pk,
+                        "name": a.name_hint or "",
+                        "isSupport": bool(a.is_support),
+                        "roles": str(a.roles),
+                        "effectiveRoles": str(a.roles),
+                        "categories": "Other",
+                    }
+                    for a in song_artists
+                ]
+            contracts.append(contract)
+        return contracts
+
+    def search_songs(self, query: Query) -> dict[str, Any]:
+        song = DumpDB.Song
+        stmt = select(song)
+        if name := _get_param(query, "query"):
+            stmt = stmt.where(
+                song.id.in_(
+                    select(DumpDB.EntryName.entry_id).where(
+                        DumpDB.EntryName.entry_type == "Song",
+                        DumpDB.EntryName.value.contains(name),
+                    )
+                )
+            )
+        if song_types := _get_param(query, "songTypes"):
+            stmt = stmt.where(song.song_type.in_(song_types.split(",")))
+        for artist_id in _get_ids(query, "artistId"):
+            stmt = stmt.where(
+                song.id.in_(
+                    select(DumpDB.SongArtist.song_id).where(
+                        DumpDB.SongArtist.artist_id == artist_id
+                    )
+                )
+            )
+        for tag_id in _get_ids(query, "tagId"):
+            stmt = stmt.where(
+                song.id.in_(
+                    select(DumpDB.EntryTag.entry_id).where(
+                        DumpDB.EntryTag.entry_type == "Song",
+                        DumpDB.EntryTag.tag_id == tag_id,
+                    )
+                )
+            )
+        if parent_id := _get_param(query, "parentSongId"):
+            stmt = stmt.where(song.original_id == int(parent_id))
+        match _get_param(query, "sort"):
+            case "Name":
+                stmt = stmt.order_by(song.name_en, song.id)
+            case "PublishDate":
+                stmt = stmt.order_by(desc(song.publish_date), desc(song.id))
+            case _:
+                stmt = stmt.order_by(desc(song.id))
+        return self._page(stmt, query, self._song_contracts)
+
+    def get_song(self, song_id: int, query: Query) -> dict[str, Any] | None:
+        with self._session() as session:
+            song = session.get(DumpDB.Song, song_id)
+        if song is None:
+            return None
+        return self._song_contracts([song], _get_fields(query))[0]
+
+    # -------------------- artists -------------------- #
+
+    def _artist_contracts(
+        self, rows: list[Any], _fields: set[str]
+    ) -> list[dict[str, Any]]:
+        names = self._names("Artist", [row.id for row in rows])
+        contracts: list[dict[str, Any]] = []
+        for row in rows:
+            default_name, language = names.get(row.id, (None, None))
+            contract: dict[str, Any] = {
+                "id": row.id,
+                "name": row.name_en or default_name or "",
+                "defaultName": default_name or row.name_en or "",
+                "defaultNameLanguage": language or "Unspecified",
+                "artistType": row.artist_type,
+                "createDate": PLACEHOLDER_DATE,
+                "deleted": False,
+                "status": "Finished",
+                "version": 0,
+            }
+            if row.release_date:
+                contract["releaseDate"] = row.release_date
+            contracts.append(contract)
+        return contracts
+
+    def search_artists(self, query: Query) -> dict[str, Any]:
+        artist = DumpDB.Artist
+        stmt = select(artist)
+        if name := _get_param(query, "query"):
+            stmt = stmt.where(
+                artist.id.in_(
+                    select(DumpDB.EntryName.entry_id).where(
+                        DumpDB.EntryName.entry_type == "Artist",
+                        DumpDB.EntryName.value.contains(name),
+                    )
+                )
+            )
+        if artist_types := _get_param(query, "artistTypes"):
+            stmt = stmt.where(artist.artist_type.in_(artist_types.split(",")))
+        stmt = stmt.order_by(desc(artist.id))
+        return self._page(stmt, query, self._artist_contracts)
+
+    # -------------------- tags -------------------- #
+
+    def get_tag(self, tag_id: int, _query: Query) -> dict[str, Any] | None:
+        with self._session() as session:
+            tag = session.get(DumpDB.Tag, tag_id)
+        if tag is None:
+            return None
+        default_name, language = self._names("Tag", [tag.id]).get(tag.id, (None, None))
+        contract: dict[str, Any] = {
+            "id": tag.id,
+            "name": tag.name_en or default_name or "",
+            "defaultNameLanguage": language or "Unspecified",
+            "categoryName": tag.category_name,
+            "additionalNames": "",
+            "urlSlug": "",
+            "targets": tag.targets or 0,
+            "status": "Finished",
+            "version": 0,
+        }
+        if tag.parent_id:
+            contract["parent"] = {"id": tag.parent_id}
+        return contract
+
+
+def make_handler(api: DumpApi) -> type[BaseHTTPRequestHandler]:
+    list_routes: dict[str, Callable[[Query], dict[str, Any]]] = {
+        "/api/songs": api.search_songs,
+        "/api/artists": api.search_artists,
+    }
+    entry_routes: list[
+        tuple[re.Pattern[str], Callable[[int, Query], dict[str, Any] | None]]
+    ] = [
+        (re.compile(r"^/api/songs/(\d+)$"), api.get_song),
+        (re.compile(r"^/api/tags/(\d+)$"), api.get_tag),
+    ]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            url = urlparse(self.path)
+            path = url.path.rstrip("/")
+            query = parse_qs(url.query)
+            try:
+                if path in list_routes:
+                    self._send_json(list_routes[path](query))
+                    return
+                for pattern, route in entry_routes:
+                    if match := pattern.match(path):
+                        data = route(int(match.group(1)), query)
+                        if data is None:
+                            self._send_json({}, HTTPStatus.NOT_FOUND)
+                        else:
+                            self._send_json(data)
+                        return
+            except ValueError as e:
+                self._send_json({"message": str(e)}, HTTPStatus.BAD_REQUEST)
+                return
+            except Exception as e:
+                logger.exception(f"Failed to answer {self.path}")
+                self._send_json({"message": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR)
+                return
+            self._send_json({"message": "Not implemented"}, HTTPStatus.NOT_FOUND)
+
+        def _send_json(
+            self, data: dict[str, Any], status: HTTPStatus = HTTPStatus.OK
+        ) -> None:
+            body = orjson.dumps(data)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            logger.debug(f"{self.address_string()} {format % args}")
+
+    return Handler
+
+
+def make_server(
+    db: DumpDB, host: str = "127.0.0.1", port: int = 8000
+) -> ThreadingHTTPServer:
+    return ThreadingHTTPServer((host, port), make_handler(DumpApi(db)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--dump", type=Path, help="Path to dump.zip")
+    args = parser.parse_args()
+
+    server = make_server(DumpDB.build(args.dump), args.host, args.port)
+    logger.info(f"Serving the dump API on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
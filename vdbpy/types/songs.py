@@ -62,6 +62,22 @@ type OptionalSongFieldName = Literal[
     # Skipped: "MainPicture", "ThumbUrl",
 ]
 
+# Optional field group filling each SongEntry attribute, for projections
+SONG_ATTRIBUTE_FIELDS: dict[str, OptionalSongFieldName] = {
+    "albums": "albums",
+    "artists": "artists",
+    "lyrics": "lyrics",
+    "names": "names",
+    "aliases": "names",
+    "pvs": "pvs",
+    "release_events": "releaseEvent",
+    "tags": "tags",
+    "external_links": "webLinks",
+    "max_milli_bpm": "bpm",
+    "min_milli_bpm": "bpm",
+    "languages": "cultureCodes",
+}
+
 
 # -------------------- dataclasses -------------------- #
 
@@ -0,0 +1,293 @@
+"""Asyncio counterparts of the fetch functions in vdbpy.utils.network.
+
+Requests are executed by the same `send_request` as the blocking functions, in
+a thread pool, so retries, 404 handling and logging behave identically.
+Concurrency is bounded per event loop by MAX_CONCURRENCY, and the request rate
+by the per-host limiters in vdbpy.utils.rate_limit shared with the blocking
+functions.
+
+    async def main() -> None:
+        songs = await asyncio.gather(
+            *(fetch_json(f"{SONG_API_URL}/{song_id}") for song_id in song_ids)
+        )
+"""
+
+import asyncio
+import functools
+import threading
+import weakref
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any
+
+import requests
+from requests import Response, Session
+
+from vdbpy.client import get_client
+from vdbpy.utils.cursor import DateCursor
+from vdbpy.utils.deadline import check_deadline
+from vdbpy.utils.logger import get_logger
+from vdbpy.utils.metrics import record_wait
+from vdbpy.utils.network import (
+    PAGE_SIZE,
+    RETRY_COUNT,
+    RETRYABLE_ERRORS,
+    HTTP_verb,
+    admit_attempt,
+    get_page_items,
+    get_page_starts,
+    give_up,
+    handle_failed_attempt,
+    is_large_listing,
+    parse_json,
+    prepare_item_params,
+    record_attempt_success,
+    send_request,
+    take_items,
+)
+from vdbpy.utils.priority import default_request_priority
+from vdbpy.utils.retry import get_circuit_breaker
+
+logger = get_logger()
+
+MAX_CONCURRENCY = 8
+
+_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+    weakref.WeakKeyDictionary()
+)
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def set_max_concurrency(max_concurrency: int) -> None:
+    """Set the number of requests allowed in flight at once.
+
+    Only affects event loops that haven't made a request yet.
+    """
+    global MAX_CONCURRENCY, _executor  # noqa: PLW0603
+    if max_concurrency < 1:
+        msg = f"Max concurrency must be positive, got {max_concurrency}"
+        raise ValueError(msg)
+    with _executor_lock:
+        MAX_CONCURRENCY = max_concurrency
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    if loop not in _semaphores:
+        _semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENCY)
+    return _semaphores[loop]
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor  # noqa: PLW0603
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_CONCURRENCY, thread_name_prefix="vdbpy-async"
+            )
+        return _executor
+
+
+async def fetch_with_retries(
+    url: str,
+    verb: HTTP_verb = "get",
+    session: Session | None = None,
+    params: dict[Any, Any] | None = None,
+    post_data: dict[Any, Any] | None = None,
+    max_retries: int = RETRY_COUNT,
+) -> Response:
+    """Fetch a URL with retries on connection errors, timeouts and 5xx responses."""
+    loop = asyncio.get_running_loop()
+    client = get_client()
+    url = client.resolve_url(url)
+    request = functools.partial(send_request, url, verb, session, params, post_data)
+    limiter = client.get_rate_limiter(url)
+    breaker = get_circuit_breaker(url)
+    for attempt in range(1, max_retries + 1):
+        check_deadline(f"{verb.upper()} {url}")
+        probe = False
+        try:
+            if limiter:
+                record_wait(url, "rate_limit", await limiter.acquire_async())
+            probe = admit_attempt(limiter, breaker)
+            async with _get_semaphore():
+                r = await loop.run_in_executor(
+                    _get_executor(), copy_context().run, request
+                )
+            r.raise_for_status()
+        except (requests.exceptions.HTTPError, *RETRYABLE_ERRORS) as e:
+            retry_wait = handle_failed_attempt(
+                url,
+                verb,
+                e,
+                attempt=attempt,
+                max_retries=max_retries,
+                limiter=limiter,
+                breaker=breaker,
+            )
+        except BaseException:
+            if probe:
+                breaker.release_probe()
+            raise
+        else:
+            record_attempt_success(limiter, breaker)
+            return r
+        if retry_wait:
+            await asyncio.sleep(retry_wait)
+
+    raise give_up(url, verb, max_retries)
+
+
+async def fetch_json(
+    url: str,
+    session: Session | None = None,
+    params: dict[Any, Any] | None = None,
+) -> dict[Any, Any]:
+    """Fetch JSON content from a URL."""
+    try:
+        r = await fetch_with_retries(url, "get", session, params)
+        return parse_json(r)
+    except requests.exceptions.HTTPError as e:
+        # Return empty dict for 404s
+        if e.response.status_code == 404:
+            return {}
+        raise
+
+
+async def fetch_json_items_with_total_count(
+    url: str,
+    params: dict[Any, Any] | None = None,
+    session: Session | None = None,
+    max_results: int = 10**9,
+    limit: int | Callable[..., bool] | None = None,
+    suppress_total_count_warning: bool = False,
+) -> tuple[list[Any], int]:
+    """Fetch the first page, then the remaining pages concurrently.
+
+    Pages are requested in batches of MAX_CONCURRENCY and consumed in order,
+    so a callable limit stops the crawl after the batch it matched in.
+    """
+    if limit == 0:
+        return [], 0
+    params, max_results = prepare_item_params(url, params, max_results)
+
+    async def fetch_page(start: int) -> list[Any] | None:
+        with default_request_priority("bulk"):
+            json = await fetch_json(
+                url, session=session, params={**params, "start": str(start)}
+            )
+        return get_page_items(json)
+
+    with default_request_priority("bulk"):
+        json = await fetch_json(url, session=session, params=params)
+    items = get_page_items(json)
+    if items is None:
+        return [], 0
+    total_count = json["totalCount"]
+    if is_large_listing(total_count, max_results) and not suppress_total_count_warning:
+        _ = await asyncio.to_thread(input, "Press enter to continue...")
+
+    all_items: list[Any] = []
+    if not items or take_items(items, all_items, limit):
+        return all_items[:max_results], total_count
+
+    starts = get_page_starts(total_count, max_results, limit)
+    for i in range(0, len(starts), MAX_CONCURRENCY):
+        if len(items) < PAGE_SIZE:
+            break
+        batch = starts[i : i + MAX_CONCURRENCY]
+        logger.debug(f"  Pages {i + 2}-{i + 1 + len(batch)}/{1 + len(starts)}")
+        for items in await asyncio.gather(*(fetch_page(start) for start in batch)):
+            if not items:
+                return all_items[:max_results], total_count
+            if take_items(items, all_items, limit):
+                return all_items[:max_results], total_count
+            if len(items) < PAGE_SIZE:
+                break
+
+    return all_items[:max_results], total_count
+
+
+async def fetch_json_items(
+    url: str,
+    params: dict[Any, Any] | None = None,
+    session: Session | None = None,
+    max_results: int = 10**9,
+    limit: int | Callable[..., bool] | None = None,
+    suppress_total_count_warning: bool = False,
+) -> list[Any]:
+    return (
+        await fetch_json_items_with_total_count(
+            url, params, session, max_results, limit, suppress_total_count_warning
+        )
+    )[0]
+
+
+async def fetch_total_count(
+    api_url: str,
+    params: dict[Any, Any] | None = None,
+    session: Session | None = None,
+) -> int:
+    logger.debug(f"Fetching total count for '{api_url} with params {params}'")
+    params = params.copy() if params is not None else {}
+    params["maxResults"] = 1
+    params["getTotalCount"] = True
+    data = await fetch_json(api_url, params=params, session=session)
+    if "totalCount" not in data:
+        logger.warning(f"Total count not found in {data}")
+        return 0
+    total_count = data["totalCount"]
+    if not total_count:
+        return 0
+    return int(total_count)
+
+
+async def fetch_all_items_between_dates(
+    api_url: str,
+    since: str = "2000-01-01T00:00:00Z",
+    before: str = "2100-01-01T00:00:00Z",
+    date_indicator: str = "createDate",
+    params: dict[Any, Any] | None = None,
+    page_size: int = PAGE_SIZE,
+    limit: int | Callable[..., bool] | None = None,
+) -> tuple[list[Any], bool]:
+    """Get all items by decreasing 'before' parameter incrementally.
+
+    Each page depends on the previous one, so pages are fetched one at a time.
+    """
+    if limit == 0:
+        return [], False
+    cursor = DateCursor(
+        api_url,
+        since=since,
+        before=before,
+        date_indicator=date_indicator,
+        params=params,
+        page_size=page_size,
+    )
+    all_items: list[Any] = []
+
+    logger.debug(
+        f"Fetching all '{api_url}' items from '{since}' to '{before}'"
+        f" with limit {limit}..."
+    )
+
+    limit_reached = False
+    while (page_params := cursor.next_params()) is not None:
+        with default_request_priority("bulk"):
+            json = await fetch_json(api_url, params=page_params)
+        if "items" not in json:
+            logger.warning(f"Items not found in json: {json}")
+            break
+        items = cursor.advance(json["items"])
+        logger.debug(f"Found {len(items)} new items.")
+        limit_reached = take_items(items, all_items, limit)
+        if limit_reached:
+            break
+
+    return all_items, limit_reached
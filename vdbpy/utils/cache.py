@@ -1,14 +1,29 @@
+import functools
+import hashlib
 import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass, replace
 from datetime import timedelta
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 from urllib.parse import urlparse
 
 import diskcache as dc
+import orjson
 from requests.sessions import Session
 
+from vdbpy.client import get_client
+from vdbpy.utils.deadline import without_deadline
 from vdbpy.utils.logger import get_logger
+from vdbpy.utils.singleflight import get_single_flight
+
+logger = get_logger()
 
 
 def get_vdbpy_cache_dir() -> Path:
@@ -23,15 +38,70 @@ def get_vdbpy_cache_dir() -> Path:
         website_slug = urlparse(website_env).netloc  # e.g. "beta.vocadb.net"
         cache_dir = cache_dir / website_slug
     cache_dir.mkdir(exist_ok=True, parents=True)
-    print(f"Cache directory: {cache_dir}")  # noqa: T201
+    logger.debug(f"Cache directory: {cache_dir}")
     return cache_dir
 
 
-cache = dc.Cache(str(get_vdbpy_cache_dir()))
+# Worker processes sharing a cache directory can spread their writes over
+# several SQLite databases, so that they don't wait for one write lock
+CACHE_SHARDS = max(1, int(os.environ.get("VDBPY_CACHE_SHARDS", "1")))
+SHARD_TIMEOUT = 60  # Seconds to wait for a busy shard, like a single dc.Cache
 
-# TODO merge logic, dry
+type DiskCache = dc.Cache | dc.FanoutCache
+
+
+def open_disk_cache(
+    directory: Path, shards: int | None = None, **settings: Any
+) -> DiskCache:
+    """Open a diskcache in `directory`, sharded by key hash if `shards` > 1.
+
+    The shard count defaults to VDBPY_CACHE_SHARDS. Each count has its own
+    subdirectory, as keys are mapped to shards by the count. A busy shard is
+    waited for up to SHARD_TIMEOUT seconds before a write is dropped.
+    """
+    shards = shards or CACHE_SHARDS
+    if shards == 1:
+        return dc.Cache(str(directory), **settings)
+    settings.setdefault("timeout", SHARD_TIMEOUT)
+    return dc.FanoutCache(str(directory / f"shards-{shards}"), shards, **settings)
+
+
+# Opened on first use, so importing vdbpy doesn't touch the disk
+_cache: DiskCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> DiskCache:
+    global _cache  # noqa: PLW0603
+    with _cache_lock:
+        if _cache is None:
+            # Entries are tagged with their namespace, for clear_cache_namespace
+            _cache = open_disk_cache(get_vdbpy_cache_dir(), tag_index=True)
+        return _cache
 
-logger = get_logger()
+
+def __getattr__(name: str) -> Any:
+    # `cache` was a module attribute opened at import time
+    if name == "cache":
+        return get_cache()
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+# Concurrent calls with the same cache key share one execution
+_flight = get_single_flight("cache")
+_MISSING = object()
+
+MEMORY_CACHE_MAX_ENTRIES = 10_000
+MEMORY_CACHE_MAX_BYTES = 64 * 1024 * 1024
+REFRESH_WORKERS = 2
+
+
+@dataclass
+class MemoryCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
 
 
 def _normalize(value: Any) -> Any:
@@ -44,95 +114,323 @@ def _normalize(value: Any) -> Any:
     return value
 
 
-def _make_cache_key(
+def _make_legacy_cache_key(
     func_name: str, args: tuple[Any, ...], kwargs: dict[str, Any]
 ) -> str:
+    """Return the key used before hashed keys, to read existing entries."""
     cache_args = [_normalize(a) for a in args if not isinstance(a, Session)]
     cache_kwargs = sorted(
         (k, _normalize(v)) for k, v in kwargs.items() if not isinstance(v, Session)
     )
-    return f"{func_name}_{cache_args}_{cache_kwargs}"
+    key = f"{func_name}_{cache_args}_{cache_kwargs}"
+    namespace = get_client().cache_namespace
+    return f"{namespace}:{key}" if namespace else key
 
 
-def cache_with_expiration(days: float = 1, *, hours: float | None = None) -> Any:
-    def decorator(func: Callable[..., Any]) -> Any:
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
-            key = _make_cache_key(func.__name__, args, kwargs)  # ty:ignore[unresolved-attribute]
-
-            try:
-                if key in cache:
-                    return cache[key]
-            except (AttributeError, ModuleNotFoundError):
-                logger.warning(
-                    f"Couldn't get '{key}' from cache due to mismatching types."
-                )
-
-            # Use original args/kwargs to call the function
-            result = func(*args, **kwargs)
-            if hours is not None:
-                expire_seconds = timedelta(hours=hours).total_seconds()
-            else:
-                expire_seconds = timedelta(days=days).total_seconds()
-            cache.set(key, result, expire=expire_seconds)
-            return result
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, set | frozenset):
+        return sorted(value, key=repr)
+    return repr(value)
 
-        return wrapper
 
-    return decorator
+def get_cache_namespace(func_name: str) -> str:
+    """Return the namespace of a function's entries for the current client."""
+    # Results of other VocaDB instances are kept apart from the default ones
+    client_namespace = get_client().cache_namespace
+    return f"{client_namespace}:{func_name}" if client_namespace else func_name
+
+
+def _make_cache_key(
+    func_name: str, args: tuple[Any, ...], kwargs: dict[str, Any], version: int = 0
+) -> str:
+    """Return "{namespace}:v{version}:{digest}" of the arguments.
+
+    Sessions are left out, so authenticated calls share entries.
+    """
+    arguments = [
+        [a for a in args if not isinstance(a, Session)],
+        {k: v for k, v in kwargs.items() if not isinstance(v, Session)},
+    ]
+    try:
+        encoded = orjson.dumps(
+            arguments, default=_encode_default, option=orjson.OPT_SORT_KEYS
+        )
+    except orjson.JSONEncodeError:
+        # Non-string dict keys or integers over 64 bits. The repr keeps the
+        # types apart, so {1: x} and {"1": x} are different arguments.
+        encoded = repr(_normalize(arguments)).encode()
+    digest = hashlib.blake2b(encoded, digest_size=16).hexdigest()
+    return f"{get_cache_namespace(func_name)}:v{version}:{digest}"
+
+
+class MemoryCache:
+    """Bounded in-process LRU tier in front of the disk cache.
+
+    Values are kept pickled, so callers get their own copy as with diskcache
+    and the size limit is exact. Entries expire with their disk counterpart.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = MEMORY_CACHE_MAX_ENTRIES,
+        max_bytes: int = MEMORY_CACHE_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.stats = MemoryCacheStats()
+        self._entries: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[bytes, float | None] | None:
+        """Return the pickled value and expire time (time.time()) of a key."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.time():
+                self._pop(key)
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry
+
+    def set(self, key: str, pickled: bytes, expire_time: float | None) -> None:
+        if len(pickled) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (pickled, expire_time)
+            self.size += len(pickled)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def _pop(self, key: str) -> None:
+        pickled, _ = self._entries.pop(key)
+        self.size -= len(pickled)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def evict_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._pop(key)
+
+    def get_stats(self) -> MemoryCacheStats:
+        with self._lock:
+            return replace(self.stats)
+
 
+memory_cache = MemoryCache()
+
+
+def get_memory_cache_stats() -> MemoryCacheStats:
+    return memory_cache.get_stats()
+
+
+class _Timestamped(NamedTuple):
+    """A result cached with stale_while_revalidate, fresh until `fresh_until`."""
+
+    value: Any
+    fresh_until: float
+
+
+_refreshing: set[str] = set()
+_refresh_lock = threading.Lock()
+_refresh_executor: ThreadPoolExecutor | None = None
+
+
+def _refresh_in_background(key: str, fetch: Callable[[], Any]) -> None:
+    """Run `fetch` in a background thread, unless a refresh of `key` is queued."""
+    global _refresh_executor  # noqa: PLW0603
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=REFRESH_WORKERS, thread_name_prefix="vdbpy-refresh"
+            )
+        executor = _refresh_executor
+
+    def refresh() -> None:
+        try:
+            # The caller got the stale value, its deadline doesn't apply
+            with without_deadline():
+                _flight.do(key, fetch)
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Couldn't refresh '{key}', keeping the stale value: {e}")
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+
+    logger.debug(f"Serving stale '{key}' while it is refreshed")
+    executor.submit(copy_context().run, refresh)
+
+
+def _read_disk(key: str) -> tuple[Any, float | None]:
+    try:
+        entry = get_cache().get(key, default=_MISSING, expire_time=True)
+    except (AttributeError, ModuleNotFoundError):
+        logger.warning(f"Couldn't get '{key}' from cache due to mismatching types.")
+        return _MISSING, None
+    if not isinstance(entry, tuple):
+        # A busy FanoutCache shard returns the bare default
+        logger.debug(f"Cache shard busy, treating '{key}' as a miss")
+        return _MISSING, None
+    return entry
+
+
+def _lookup(key: str, tag: str, get_legacy_key: Callable[[], str] | None = None) -> Any:
+    """Return the cached value of a key from memory or disk, or _MISSING.
+
+    An entry found under the legacy key is moved to `key`.
+    """
+    if (entry := memory_cache.get(key)) is not None:
+        return pickle.loads(entry[0])  # noqa: S301
+    result, expire_time = _read_disk(key)
+    if result is _MISSING and get_legacy_key is not None:
+        legacy_key = get_legacy_key()
+        result, expire_time = _read_disk(legacy_key)
+        if result is not _MISSING:
+            expire = expire_time - time.time() if expire_time is not None else None
+            get_cache().set(key, result, expire=expire, tag=tag)
+            get_cache().delete(legacy_key)
+    if result is not _MISSING:
+        memory_cache.set(key, pickle.dumps(result), expire_time)
+    return result
+
+
+_checked_versions: set[tuple[str, int]] = set()
+
+
+def _check_version(namespace: str, version: int) -> None:
+    """Clear a namespace once when its function's cache version changed."""
+    if (namespace, version) in _checked_versions:
+        return
+    version_key = f"__version__:{namespace}"
+    entry = get_cache().get(version_key, default=0, expire_time=True)
+    if not isinstance(entry, tuple):
+        # A busy FanoutCache shard returns the bare default, check again later
+        logger.debug(f"Cache shard busy, skipping the version check of '{namespace}'")
+        return
+    stored, _ = entry
+    if stored != version:
+        logger.info(f"Cache version of '{namespace}' changed, clearing its entries")
+        clear_cache_namespace(namespace)
+        get_cache().set(version_key, version, retry=True)
+    _checked_versions.add((namespace, version))
+
+
+def clear_cache_namespace(namespace: str | Callable[..., Any]) -> int:
+    """Remove the entries of a cached function (or namespace) of the client.
+
+    Return the number of entries removed from disk.
+    """
+    if not isinstance(namespace, str):
+        namespace = get_cache_namespace(namespace.__name__)  # ty:ignore[unresolved-attribute]
+    memory_cache.evict_prefix(f"{namespace}:v")
+    return get_cache().evict(namespace)
+
+
+def _cached(
+    get_expire: Callable[[Any], float | None],
+    stale_seconds: float = 0,
+    version: int = 0,
+) -> Any:
+    """Cache results in memory and on disk, for `get_expire(result)` seconds.
+
+    An expire of None keeps the result until it is evicted from the disk cache.
+    With `stale_seconds`, an expired result is still returned for that long
+    while a background thread refreshes it. Changing `version` clears the
+    entries cached with other versions of the function.
+    """
 
-def cache_without_expiration() -> Any:
     def decorator(func: Callable[..., Any]) -> Any:
+        @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            key = _make_cache_key(func.__name__, args, kwargs)  # ty:ignore[unresolved-attribute]
+            func_name: str = func.__name__  # ty:ignore[unresolved-attribute]
+            namespace = get_cache_namespace(func_name)
+            _check_version(namespace, version)
+            key = _make_cache_key(func_name, args, kwargs, version)
 
-            try:
-                if key in cache:
-                    return cache[key]
-            except (AttributeError, ModuleNotFoundError):
-                logger.warning(
-                    f"Couldn't get '{key}' from cache due to mismatching types."
-                )
+            def fetch() -> Any:
+                # Use original args/kwargs to call the function
+                result = func(*args, **kwargs)
+                expire = get_expire(result)
+                stored = result
+                if stale_seconds and expire is not None:
+                    stored = _Timestamped(result, time.time() + expire)
+                    expire += stale_seconds
+                get_cache().set(key, stored, expire=expire, tag=namespace)
+                expire_time = time.time() + expire if expire is not None else None
+                memory_cache.set(key, pickle.dumps(stored), expire_time)
+                return result
 
-            # Use original args/kwargs to call the function
-            result = func(*args, **kwargs)
-            cache.set(key, result, expire=None)  # No expiration
-            return result
+            # Entries cached before hashed keys are still read at version 0
+            get_legacy_key = (
+                None
+                if version
+                else functools.partial(_make_legacy_cache_key, func_name, args, kwargs)
+            )
+            if (hit := _lookup(key, namespace, get_legacy_key)) is not _MISSING:
+                if not isinstance(hit, _Timestamped):
+                    return hit
+                if hit.fresh_until > time.time():
+                    return hit.value
+                if stale_seconds:
+                    _refresh_in_background(key, fetch)
+                    return hit.value
+            return _flight.do(key, fetch)
 
         return wrapper
 
     return decorator
 
 
-def cache_conditionally(days: float = 1) -> Any:
+def cache_with_expiration(
+    days: float = 1,
+    *,
+    hours: float | None = None,
+    stale_while_revalidate: timedelta | None = None,
+    version: int = 0,
+) -> Any:
+    """Cache results for `days` (or `hours`).
+
+    With `stale_while_revalidate`, an expired result is returned immediately
+    and refreshed in the background, for at most that long after it expired.
+    """
+    if hours is not None:
+        expire_seconds = timedelta(hours=hours).total_seconds()
+    else:
+        expire_seconds = timedelta(days=days).total_seconds()
+    stale_seconds = (
+        stale_while_revalidate.total_seconds() if stale_while_revalidate else 0
+    )
+    return _cached(lambda _: expire_seconds, stale_seconds, version)
+
+
+def cache_without_expiration(*, version: int = 0) -> Any:
+    return _cached(lambda _: None, version=version)  # No expiration
+
+
+def cache_conditionally(days: float = 1, *, version: int = 0) -> Any:
     # Return values that are truthly are permanently cached
     # Falsy values are cached for the specified amount
-    def decorator(func: Callable[..., Any]) -> Any:
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
-            key = _make_cache_key(func.__name__, args, kwargs)  # ty:ignore[unresolved-attribute]
-            try:
-                if key in cache:
-                    return cache[key]
-            except (AttributeError, ModuleNotFoundError):
-                logger.warning(
-                    f"Couldn't get '{key}' from cache due to mismatching types."
-                )
-
-            # Use original args/kwargs to call the function
-            result = func(*args, **kwargs)
-            if not result:
-                logger.debug(
-                    f"Caching result '{result}' for {days} days with key '{key}'"
-                )
-                expire_time = timedelta(days=days).total_seconds()
-                cache.set(key, result, expire=expire_time)
-            else:
-                # No expiration if result found
-                logger.debug(f"Caching result '{result}' permanently with key '{key}'")
-                cache.set(key, result, expire=None)
-
-            return result
+    expire_seconds = timedelta(days=days).total_seconds()
 
-        return wrapper
+    def get_expire(result: Any) -> float | None:
+        if not result:
+            logger.debug(f"Caching result '{result}' for {days} days")
+            return expire_seconds
+        # No expiration if result found
+        logger.debug(f"Caching result '{result}' permanently")
+        return None
 
-    return decorator
+    return _cached(get_expire, version=version)
@@ -0,0 +1,197 @@
+"""Record and replay of HTTP responses for offline, reproducible runs.
+
+    VDBPY_CASSETTE=run.cassette VDBPY_CASSETTE_MODE=record python script.py
+    VDBPY_CASSETTE=run.cassette python script.py  # replay, no network
+
+The cassette is a JSON lines file with one response per line, next to an
+index file mapping each request to the offsets of its responses, so a replay
+only reads the responses it uses. A request recorded several times is
+replayed in the recorded order, the last response repeating once exhausted.
+
+VDBPY_CASSETTE_LATENCY sets a simulated latency per replayed response in
+seconds, or "recorded" to reproduce the recorded latencies.
+"""
+
+import atexit
+import base64
+import os
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Literal
+
+import orjson
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from vdbpy.utils.logger import get_logger
+
+logger = get_logger()
+
+type CassetteMode = Literal["record", "replay"]
+
+# Headers describing the original encoding of the body, which isn't kept
+_DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+class CassetteMissError(Exception):
+    """Raised when a replayed request was not recorded."""
+
+
+def make_request_key(
+    verb: str,
+    url: str,
+    params: dict[Any, Any] | None = None,
+    post_data: dict[Any, Any] | None = None,
+    headers: dict[str, str] | None = None,
+) -> str:
+    def normalize(values: dict[Any, Any] | None) -> list[tuple[str, str]]:
+        return sorted((str(k), str(v)) for k, v in (values or {}).items())
+
+    return orjson.dumps(
+        [verb, url, normalize(params), normalize(post_data), normalize(headers)]
+    ).decode()
+
+
+class Cassette:
+    def __init__(
+        self,
+        path: Path,
+        mode: CassetteMode = "replay",
+        latency: float | Literal["recorded"] = 0.0,
+    ):
+        if mode == "replay" and not path.is_file():
+            msg = f"Cassette {path} not found"
+            raise FileNotFoundError(msg)
+        self.path = path
+        self.index_path = path.with_name(f"{path.name}.index")
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._replayed: Counter[str] = Counter()
+        self._index = self._load_index()
+        if mode == "record":
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atexit.register(self.save_index)
+
+    def _load_index(self) -> dict[str, list[int]]:
+        if not self.path.is_file():
+            return {}
+        size = self.path.stat().st_size
+        try:
+            index = orjson.loads(self.index_path.read_bytes())
+            if index["size"] == size:
+                return index["offsets"]
+        except (FileNotFoundError, orjson.JSONDecodeError, KeyError):
+            pass
+        logger.info(f"Rebuilding the index of cassette {self.path}")
+        offsets: dict[str, list[int]] = {}
+        with self.path.open("rb") as f:
+            offset = 0
+            for line in f:
+                offsets.setdefault(orjson.loads(line)["key"], []).append(offset)
+                offset += len(line)
+        return offsets
+
+    def save_index(self) -> None:
+        with self._lock:
+            index = {"size": self.path.stat().st_size, "offsets": self._index}
+            self.index_path.write_bytes(orjson.dumps(index))
+
+    def record(self, key: str, r: Response, latency: float) -> None:
+        try:
+            body = {"text": r.content.decode("utf-8")}
+        except UnicodeDecodeError:
+            body = {"base64": base64.b64encode(r.content).decode()}
+        headers = {
+            k: v for k, v in r.headers.items() if k.lower() not in _DROPPED_HEADERS
+        }
+        line = orjson.dumps(
+            {
+                "key": key,
+                "status": r.status_code,
+                "reason": r.reason,
+                "url": r.url,
+                "headers": headers,
+                "latency": latency,
+                **body,
+            }
+        )
+        with self._lock, self.path.open("ab") as f:
+            self._index.setdefault(key, []).append(f.tell())
+            f.write(line + b"\n")
+
+    def replay(self, key: str) -> Response:
+        with self._lock:
+            offsets = self._index.get(key)
+            if not offsets:
+                msg = f"No recorded response for {key} in {self.path}"
+                raise CassetteMissError(msg)
+            offset = offsets[min(self._replayed[key], len(offsets) - 1)]
+            self._replayed[key] += 1
+            with self.path.open("rb") as f:
+                f.seek(offset)
+                data = orjson.loads(f.readline())
+
+        latency = data["latency"] if self.latency == "recorded" else self.latency
+        if latency:
+            time.sleep(latency)
+        r = Response()
+        r.status_code = data["status"]
+        r.reason = data["reason"]
+        r.url = data["url"]
+        r.headers = CaseInsensitiveDict(data["headers"])
+        if "base64" in data:
+            r._content = base64.b64decode(data["base64"])  # noqa: SLF001
+        else:
+            r._content = data["text"].encode("utf-8")  # noqa: SLF001
+            r.encoding = "utf-8"
+        r.elapsed = timedelta(seconds=latency)
+        return r
+
+
+_cassette: Cassette | None = None
+_cassette_loaded = False
+_cassette_lock = threading.Lock()
+
+
+def _cassette_from_env() -> Cassette | None:
+    path = os.environ.get("VDBPY_CASSETTE")
+    if not path:
+        return None
+    mode = os.environ.get("VDBPY_CASSETTE_MODE", "replay")
+    if mode not in ("record", "replay"):
+        msg = f"Invalid VDBPY_CASSETTE_MODE '{mode}', use 'record' or 'replay'"
+        raise ValueError(msg)
+    latency = os.environ.get("VDBPY_CASSETTE_LATENCY", "0")
+    logger.info(f"Using cassette {path} in {mode} mode")
+    return Cassette(
+        Path(path), mode, "recorded" if latency == "recorded" else float(latency)
+    )
+
+
+def get_cassette() -> Cassette | None:
+    """Return the active cassette, set up from VDBPY_CASSETTE on first use."""
+    global _cassette, _cassette_loaded  # noqa: PLW0603
+    if _cassette_loaded:
+        return _cassette
+    with _cassette_lock:
+        if not _cassette_loaded:
+            _cassette = _cassette_from_env()
+            _cassette_loaded = True
+        return _cassette
+
+
+def use_cassette(cassette: Cassette | None) -> None:
+    """Record or replay all requests with the cassette (None to disable)."""
+    global _cassette, _cassette_loaded  # noqa: PLW0603
+    with _cassette_lock:
+        _cassette = cassette
+        _cassette_loaded = True
+
+
+def is_replaying() -> bool:
+    cassette = get_cassette()
+    return cassette is not None and cassette.mode == "replay"
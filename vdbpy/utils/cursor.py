@@ -0,0 +1,131 @@
+"""Deduplicating, resumable cursor over feeds sorted by decreasing date.
+
+The activity and comment APIs are paginated with a `before` date instead of an
+offset. Items sharing the boundary date are returned again on the next page,
+so the cursor remembers the keys seen at the current `before` value and drops
+them. With a checkpoint file the position is saved after every page, and a
+new cursor with the same query continues where the previous one stopped.
+"""
+
+import os
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from vdbpy.utils.logger import get_logger
+
+logger = get_logger()
+
+
+def get_item_key(item: dict[Any, Any]) -> str:
+    """Identify an activity entry, comment or any other item of a feed."""
+    if "id" in item:
+        return str(item["id"])
+    if "archivedVersion" in item:
+        return f"{item['entry']['entryType']}-{item['archivedVersion']['id']}"
+    return orjson.dumps(item, option=orjson.OPT_SORT_KEYS).decode()
+
+
+class DateCursor:
+    """Position in a feed: the `before` date and the keys already seen at it.
+
+    The cursor does no requests itself. `next_params()` returns the parameters
+    of the next page (None when the feed is exhausted) and `advance()` takes
+    the page's items and returns the new ones.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        *,
+        since: str,
+        before: str,
+        date_indicator: str,
+        params: dict[Any, Any] | None,
+        page_size: int,
+        checkpoint: Path | None = None,
+        key: Callable[[dict[Any, Any]], str] = get_item_key,
+    ):
+        self.params = params.copy() if params is not None else {}
+        self.params["maxResults"] = page_size
+        self.params["since"] = since
+        self.page_size = page_size
+        self.date_indicator = date_indicator
+        self.checkpoint = checkpoint
+        self.key = key
+        self.query = {
+            "api_url": api_url,
+            "date_indicator": date_indicator,
+            "params": {k: str(v) for k, v in sorted(self.params.items())},
+        }
+        self.before = before
+        self.seen: set[str] = set()
+        self.count = 0
+        self.done = False
+        if checkpoint and checkpoint.is_file():
+            self._load(checkpoint)
+
+    def _load(self, checkpoint: Path) -> None:
+        try:
+            state = orjson.loads(checkpoint.read_bytes())
+        except orjson.JSONDecodeError:
+            logger.warning(f"Invalid checkpoint {checkpoint}, starting over.")
+            return
+        if state.get("query") != self.query:
+            logger.warning(f"Checkpoint {checkpoint} is for another query, ignoring.")
+            return
+        self.before = state["before"]
+        self.seen = set(state["seen"])
+        self.count = state["count"]
+        self.done = state["done"]
+        logger.info(
+            f"Resuming from {self.before} after {self.count} items ({checkpoint})"
+        )
+
+    def save(self) -> None:
+        """Write the position to the checkpoint file, if any."""
+        if not self.checkpoint:
+            return
+        state = {
+            "query": self.query,
+            "before": self.before,
+            "seen": sorted(self.seen),
+            "count": self.count,
+            "done": self.done,
+        }
+        self.checkpoint.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.checkpoint.with_suffix(".tmp")
+        temp_path.write_bytes(orjson.dumps(state))
+        os.replace(temp_path, self.checkpoint)
+
+    def next_params(self) -> dict[Any, Any] | None:
+        if self.done:
+            return None
+        return {**self.params, "before": self.before}
+
+    def advance(self, items: list[Any]) -> list[Any]:
+        """Move past a page and return its items not returned before."""
+        new_items = [item for item in items if self.key(item) not in self.seen]
+        self.count += len(new_items)
+        if len(items) < self.page_size:
+            logger.debug(f"Less than {self.page_size} items, stopping.")
+            self.done = True
+        elif not new_items:
+            logger.warning(
+                f"More than {self.page_size} items dated {self.before},"
+                " some of them may be missing."
+            )
+            self.done = True
+        else:
+            boundary = items[-1][self.date_indicator]
+            if boundary != self.before:
+                self.before = boundary
+                self.seen = set()
+            self.seen.update(
+                self.key(item)
+                for item in items
+                if item[self.date_indicator] == boundary
+            )
+        return new_items
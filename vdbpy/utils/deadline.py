@@ -0,0 +1,74 @@
+"""Time budgets shared by all requests made within a block.
+
+    with deadline(5):
+        user_ids = get_relevant_user_ids_by_song_id(song_id)
+
+Requests sent in the block get at most the remaining time as their timeout,
+rate limiter waits and retries that would outlast the deadline are skipped,
+and DeadlineExceededError is raised once the budget is spent. Nested
+deadlines can only shorten the budget. The deadline follows the pages fetched
+by the pagination helpers into their worker threads.
+"""
+
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_deadline: ContextVar[float | None] = ContextVar("vdbpy_deadline", default=None)
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when the time budget of a deadline block is spent."""
+
+
+@contextmanager
+def deadline(seconds: float) -> Generator[None]:
+    """Give the requests made in the block `seconds` seconds in total."""
+    expires_at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        expires_at = min(expires_at, current)
+    token = _deadline.set(expires_at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def without_deadline() -> Generator[None]:
+    """Lift the deadline for work that outlives the caller, such as refreshes."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def get_remaining_time() -> float | None:
+    """Return the seconds left before the deadline, or None without one."""
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+
+def check_deadline(action: str = "request") -> None:
+    remaining = get_remaining_time()
+    if remaining is not None and remaining <= 0:
+        msg = f"Deadline exceeded before {action}"
+        raise DeadlineExceededError(msg)
+
+
+def fits_deadline(seconds: float) -> bool:
+    """Return whether waiting `seconds` still leaves time before the deadline."""
+    remaining = get_remaining_time()
+    return remaining is None or seconds < remaining
+
+
+def cap_timeout(timeout: float) -> float:
+    """Cap a request timeout to the remaining time."""
+    check_deadline()
+    remaining = get_remaining_time()
+    return timeout if remaining is None else min(timeout, remaining)
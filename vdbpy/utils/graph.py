@@ -1,8 +1,6 @@
 from collections.abc import Callable
 from datetime import UTC, datetime
 
-import plotly.graph_objects as go
-
 from vdbpy.utils.logger import get_logger
 
 logger = get_logger()
@@ -15,6 +13,8 @@ def generate_date_graph(
     y: str = "Count",
     date_format: str = "%Y-%m",
 ) -> None:
+    import plotly.graph_objects as go  # noqa: PLC0415
+
     dates, values = zip(*data, strict=True)
 
     dates = [datetime.strptime(date, date_format).replace(tzinfo=UTC) for date in dates]
@@ -0,0 +1,189 @@
+"""Opt-in request metrics per endpoint template.
+
+Requests are grouped by URL path with ids replaced, e.g.
+`/api/songs/{id}/tagUsages`. For each endpoint, the request count, status
+codes, retries, downloaded bytes, latency histogram and the time spent waiting
+for the rate limiter and for retries are recorded.
+
+Enable with VDBPY_METRICS=<path> (or enable_metrics(path)) to write the
+metrics at exit, as Prometheus text if the path ends with .prom and as JSON
+otherwise.
+"""
+
+import atexit
+import bisect
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal
+from urllib.parse import urlparse
+
+import orjson
+
+from vdbpy.utils.logger import get_logger
+
+logger = get_logger()
+
+# Upper bounds of the latency buckets in seconds
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PERCENTILES = (50, 95, 99)
+
+type WaitKind = Literal["rate_limit", "retry"]
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8}-[0-9a-f-]{27})$", re.IGNORECASE)
+
+
+def get_endpoint_template(url: str) -> str:
+    """Replace the ids in the URL path: /api/songs/123 -> /api/songs/{id}."""
+    path = urlparse(url).path.rstrip("/") or "/"
+    return "/".join(
+        "{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")
+    )
+
+
+@dataclass
+class EndpointMetrics:
+    requests: int = 0
+    statuses: Counter[str] = field(default_factory=Counter)
+    retries: int = 0
+    bytes: int = 0
+    latency_seconds: float = 0.0
+    latency_buckets: list[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1)
+    )
+    waits: Counter[WaitKind] = field(default_factory=Counter)
+    wait_seconds: defaultdict[WaitKind, float] = field(
+        default_factory=lambda: defaultdict(float)
+    )
+
+    def percentile(self, p: float) -> float:
+        """Estimate a latency percentile by interpolating within its bucket."""
+        if not self.requests:
+            return 0.0
+        rank = self.requests * p / 100
+        seen = 0
+        for i, count in enumerate(self.latency_buckets):
+            if count and seen + count >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return LATENCY_BUCKETS[-1]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "statuses": dict(self.statuses),
+            "retries": self.retries,
+            "bytes": self.bytes,
+            "latency_seconds": self.latency_seconds,
+            **{f"p{p}_seconds": self.percentile(p) for p in PERCENTILES},
+            "waits": dict(self.waits),
+            "wait_seconds": dict(self.wait_seconds),
+        }
+
+
+_enabled = False
+_endpoints: dict[str, EndpointMetrics] = {}
+_lock = threading.Lock()
+
+
+def _get_endpoint(url: str) -> EndpointMetrics:
+    template = get_endpoint_template(url)
+    if template not in _endpoints:
+        _endpoints[template] = EndpointMetrics()
+    return _endpoints[template]
+
+
+def record_request(url: str, status: int | None, latency: float, size: int = 0) -> None:
+    """Record a request. A status of None means the request failed to connect."""
+    if not _enabled:
+        return
+    with _lock:
+        metrics = _get_endpoint(url)
+        metrics.requests += 1
+        metrics.statuses[str(status) if status else "error"] += 1
+        metrics.bytes += size
+        metrics.latency_seconds += latency
+        metrics.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+
+def record_wait(url: str, kind: WaitKind, seconds: float) -> None:
+    """Record a rate limiter wait or a retry (with its backoff, possibly 0)."""
+    if not _enabled:
+        return
+    with _lock:
+        metrics = _get_endpoint(url)
+        if kind == "retry":
+            metrics.retries += 1
+        if seconds > 0:
+            metrics.waits[kind] += 1
+            metrics.wait_seconds[kind] += seconds
+
+
+def get_metrics() -> dict[str, dict[str, Any]]:
+    """Return the metrics of each endpoint, the slowest in total first."""
+    with _lock:
+        endpoints = sorted(
+            _endpoints.items(), key=lambda item: -item[1].latency_seconds
+        )
+        return {template: metrics.to_dict() for template, metrics in endpoints}
+
+
+def reset_metrics() -> None:
+    with _lock:
+        _endpoints.clear()
+
+
+def metrics_to_prometheus() -> str:
+    lines: list[str] = []
+    with _lock:
+        for template, metrics in _endpoints.items():
+            label = f'endpoint="{template}"'
+            lines.extend(
+                f'vdbpy_requests_total{{{label},status="{status}"}} {count}'
+                for status, count in metrics.statuses.items()
+            )
+            lines.append(f"vdbpy_retries_total{{{label}}} {metrics.retries}")
+            lines.append(f"vdbpy_response_bytes_total{{{label}}} {metrics.bytes}")
+            cumulative = 0
+            for bound, count in zip(
+                [*LATENCY_BUCKETS, "+Inf"], metrics.latency_buckets, strict=True
+            ):
+                cumulative += count
+                lines.append(
+                    f'vdbpy_request_seconds_bucket{{{label},le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                f"vdbpy_request_seconds_sum{{{label}}} {metrics.latency_seconds}"
+            )
+            lines.append(f"vdbpy_request_seconds_count{{{label}}} {metrics.requests}")
+            lines.extend(
+                f'vdbpy_wait_seconds_total{{{label},kind="{kind}"}} {seconds}'
+                for kind, seconds in metrics.wait_seconds.items()
+            )
+    return "\n".join(lines) + "\n"
+
+
+def dump_metrics(path: Path) -> None:
+    """Write the metrics as Prometheus text (.prom) or JSON (anything else)."""
+    if path.suffix == ".prom":
+        path.write_text(metrics_to_prometheus(), encoding="utf8")
+    else:
+        path.write_bytes(orjson.dumps(get_metrics(), option=orjson.OPT_INDENT_2))
+    logger.info(f"Network metrics written to {path}")
+
+
+def enable_metrics(path: Path | None = None) -> None:
+    """Start recording metrics, and write them to `path` at exit if given."""
+    global _enabled  # noqa: PLW0603
+    _enabled = True
+    if path:
+        atexit.register(dump_metrics, path)
+
+
+if metrics_path := os.environ.get("VDBPY_METRICS"):
+    enable_metrics(Path(metrics_path))
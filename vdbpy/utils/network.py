@@ -1,26 +1,319 @@
+import os
+import threading
 import time
-from collections.abc import Callable
+from collections import deque
+from collections.abc import Callable, Generator, Iterator
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import closing
+from contextvars import copy_context
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime, timedelta
+from itertools import islice
+from pathlib import Path
 from typing import Any, Literal
 
+import orjson
 import requests
 from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from vdbpy.client import get_client
 from vdbpy.config import ACTIVITY_API_URL
-from vdbpy.utils.cache import cache_with_expiration, cache_without_expiration
+from vdbpy.utils.cache import (
+    DiskCache,
+    cache_with_expiration,
+    cache_without_expiration,
+    get_vdbpy_cache_dir,
+    open_disk_cache,
+)
+from vdbpy.utils.cassette import get_cassette, make_request_key
+from vdbpy.utils.cursor import DateCursor, get_item_key
+from vdbpy.utils.date import parse_date
+from vdbpy.utils.deadline import (
+    DeadlineExceededError,
+    cap_timeout,
+    check_deadline,
+    fits_deadline,
+)
 from vdbpy.utils.logger import get_logger
+from vdbpy.utils.metrics import record_request, record_wait
+from vdbpy.utils.priority import default_request_priority
+from vdbpy.utils.rate_limit import (
+    THROTTLE_STATUS_CODES,
+    TokenBucket,
+    parse_retry_after,
+)
+from vdbpy.utils.retry import (
+    BACKOFF_BASE,
+    SERVER_ERROR_BACKOFF_BASE,
+    CircuitBreaker,
+    CircuitOpenError,
+    FailureReason,
+    backoff_delay,
+    get_circuit_breaker,
+    record_fail_fast,
+    record_failure_reason,
+    record_give_up,
+    record_retry,
+)
+from vdbpy.utils.singleflight import get_single_flight
 
 logger = get_logger()
-BASE_DELAY = 1
 BASE_TIMEOUT = 20
 PAGE_SIZE = 50
+PAGE_WORKERS = 4
 TOTAL_COUNT_WARNING = 5000
 RETRY_COUNT = 5
-RETRY_TIMER = 10
-
-# TODO user agent
+POOL_SIZE = 16
+USER_AGENT = "vdbpy (+https://github.com/Shiroizu/VDBpy)"
+HTTP_CACHE_EXPIRE = timedelta(days=30).total_seconds()
+STREAM_CHUNK_SIZE = 1 << 16
 
 HTTP_verb = Literal["get", "post", "delete"]
 
+RETRYABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ReadTimeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+_default_session: Session | None = None
+_default_session_pid = 0
+_default_session_lock = threading.Lock()
+_flight = get_single_flight("fetch_json")
+_http_cache: DiskCache | None = None
+_http_cache_lock = threading.Lock()
+
+
+@dataclass
+class HttpCacheStats:
+    hits: int = 0  # 304 Not Modified
+    misses: int = 0
+    stores: int = 0
+
+
+_http_cache_stats = HttpCacheStats()
+
+
+def create_session(pool_size: int = POOL_SIZE) -> Session:
+    """Create a session with a keep-alive connection pool of `pool_size` per host.
+
+    Only connection failures are retried by the adapter, quickly and before
+    anything is sent. Everything else is left to fetch_with_retries.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=2, connect=2, read=False, status=0, other=0, backoff_factor=0.1
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Connection": "keep-alive"})
+    return session
+
+
+def get_default_session() -> Session:
+    """Return the pooled session used for requests without an explicit session.
+
+    The pool is shared by all threads and recreated in forked processes. Within
+    a VDBClient.use() block, the client's own pool is used.
+    """
+    client = get_client()
+    if not client.is_default:
+        return client.get_session()
+    global _default_session, _default_session_pid  # noqa: PLW0603
+    with _default_session_lock:
+        if _default_session is None or _default_session_pid != os.getpid():
+            _default_session = create_session()
+            _default_session_pid = os.getpid()
+        return _default_session
+
+
+def send_request(
+    url: str,
+    verb: HTTP_verb,
+    session: Session | None = None,
+    params: dict[Any, Any] | None = None,
+    post_data: dict[Any, Any] | None = None,
+    headers: dict[str, str] | None = None,
+    stream: bool = False,
+) -> Response:
+    """Send a single request without retries or rate limiting.
+
+    With an active cassette, the response is recorded or replayed. With
+    `stream`, the body is left unread for Response.iter_content, except when
+    it is recorded.
+    """
+    url = get_client().resolve_url(url)
+    cassette = get_cassette()
+    key = make_request_key(verb, url, params, post_data, headers) if cassette else ""
+    start = time.perf_counter()
+    try:
+        if cassette and cassette.mode == "replay":
+            r = cassette.replay(key)
+        else:
+            requester = session or get_default_session()
+            r = getattr(requester, verb)(
+                url,
+                params=params,
+                timeout=cap_timeout(BASE_TIMEOUT),
+                data=post_data,
+                headers=headers,
+                stream=stream,
+            )
+    except requests.exceptions.RequestException:
+        record_request(url, None, time.perf_counter() - start)
+        raise
+    latency = time.perf_counter() - start
+    if cassette and cassette.mode == "record":
+        cassette.record(key, r, latency)
+    if stream and not cassette:
+        size = int(r.headers.get("Content-Length", 0))
+    else:
+        size = len(r.content)
+    record_request(url, r.status_code, latency, size)
+    assert isinstance(r, Response)  # noqa: S101
+    logger.debug(f"{verb.upper()} {r.status_code} {r.reason} {r.url}")
+    return r
+
+
+def classify_failure(r: Response | None) -> FailureReason:
+    """Return why an attempt failed, given its error response if any."""
+    if r is None or r.status_code == 408:
+        return "connection"
+    if r.status_code in THROTTLE_STATUS_CODES:
+        return "throttled"
+    if r.status_code in range(500, 600):
+        return "server_error"
+    return "client_error"
+
+
+def get_retry_wait(
+    attempt: int,
+    r: Response | None,
+    reason: FailureReason,
+    limiter: TokenBucket | None,
+    breaker: CircuitBreaker,
+) -> float:
+    """Record a retryable failure and return the delay before the next attempt."""
+    if r is not None and r.status_code == 429:
+        breaker.record_success()  # The host is up, only busy
+    else:
+        breaker.record_failure()
+    if r is not None and limiter and reason == "throttled":
+        retry_after = parse_retry_after(r.headers.get("Retry-After"))
+        limiter.penalize(retry_after)
+        if retry_after is not None:
+            # The limiter holds the next request back until Retry-After has passed
+            return 0
+    base = BACKOFF_BASE if reason == "connection" else SERVER_ERROR_BACKOFF_BASE
+    return backoff_delay(attempt, base)
+
+
+def is_limit_reached(
+    item: Any, count: int, limit: int | Callable[..., bool] | None
+) -> bool:
+    """Return True if `item` is past the limit, with `count` items taken so far."""
+    if isinstance(limit, int) and count >= limit:
+        logger.debug(f"Limit {limit} reached, stopping.")
+        return True
+    if callable(limit) and limit(item):
+        logger.debug("Limit condition met, stopping.")
+        return True
+    return False
+
+
+def take_items(
+    items: list[Any],
+    all_items: list[Any],
+    limit: int | Callable[..., bool] | None,
+) -> bool:
+    """Append items until the limit is met. Return True if the limit was reached."""
+    for item in items:
+        if is_limit_reached(item, len(all_items), limit):
+            return True
+        all_items.append(item)
+    return False
+
+
+def handle_failed_attempt(
+    url: str,
+    verb: HTTP_verb,
+    error: requests.exceptions.RequestException,
+    *,
+    attempt: int,
+    max_retries: int,
+    limiter: TokenBucket | None,
+    breaker: CircuitBreaker,
+) -> float:
+    """Classify a failed attempt and return the seconds to wait before the next.
+
+    Re-raise `error` if it shouldn't be retried and raise DeadlineExceededError
+    if the wait would outlast the deadline. Shared by the blocking and the
+    asyncio fetch_with_retries.
+    """
+    if isinstance(error, requests.exceptions.HTTPError):
+        logger.warning(f"HTTP error: {error}")
+        r = error.response
+    else:
+        logger.warning(f"Connection issue: {error}")
+        r = None
+    reason = classify_failure(r)
+    record_failure_reason(url, reason)
+    if reason == "client_error":
+        # Don't retry on 404s or other client errors
+        if r is not None and r.status_code == 404:
+            logger.warning(f"Not found: {url}")
+        record_fail_fast(url)
+        breaker.record_success()
+        raise error
+    retry_wait = get_retry_wait(attempt, r, reason, limiter, breaker)
+    if attempt >= max_retries or breaker.state != "closed":
+        return 0
+    if not fits_deadline(retry_wait):
+        record_give_up(url)
+        msg = f"Deadline exceeded before retrying {verb.upper()} {url}"
+        raise DeadlineExceededError(msg)
+    logger.warning(f"Retry attempt #{attempt}/{max_retries}")
+    record_retry(url, retry_wait)
+    record_wait(url, "retry", retry_wait)
+    if retry_wait:
+        logger.warning(f"Trying again in {retry_wait:.1f} seconds...")
+    return retry_wait
+
+
+def admit_attempt(limiter: TokenBucket | None, breaker: CircuitBreaker) -> bool:
+    """Check the circuit once the rate limit token is held.
+
+    Return whether the attempt is the half-open probe. The token is returned
+    to the limiter if the circuit is open.
+    """
+    try:
+        return breaker.before_request()
+    except CircuitOpenError:
+        if limiter:
+            limiter.refund()
+        raise
+
+
+def record_attempt_success(
+    limiter: TokenBucket | None, breaker: CircuitBreaker
+) -> None:
+    breaker.record_success()
+    if limiter:
+        limiter.reward()
+
+
+def give_up(url: str, verb: HTTP_verb, max_retries: int) -> Exception:
+    record_give_up(url)
+    msg = f"Failed to fetch {verb.upper()} from {url} after {max_retries} retries"
+    return Exception(msg)
+
 
 def fetch_with_retries(
     url: str,
@@ -29,55 +322,81 @@ def fetch_with_retries(
     params: dict[Any, Any] | None = None,
     post_data: dict[Any, Any] | None = None,
     max_retries: int = RETRY_COUNT,
+    headers: dict[str, str] | None = None,
+    stream: bool = False,
 ) -> Response:
-    """Fetch a URL with automatic retries on connection errors."""
-    r: Response | None = None
+    """Fetch a URL with retries on connection errors, timeouts and 5xx responses.
+
+    Retries back off exponentially with jitter. Raises CircuitOpenError while
+    the host's circuit is open and HTTPError for client errors (4xx).
+    """
+    client = get_client()
+    url = client.resolve_url(url)
+    limiter = client.get_rate_limiter(url)
+    breaker = get_circuit_breaker(url)
     for attempt in range(1, max_retries + 1):
+        check_deadline(f"{verb.upper()} {url}")
+        probe = False
         try:
-            # Execute the request
-            if session:
-                r = getattr(session, verb)(
-                    url, params=params, timeout=BASE_TIMEOUT, data=post_data
-                )
-            else:
-                r = getattr(requests, verb)(
-                    url, params=params, timeout=BASE_TIMEOUT, data=post_data
-                )
+            if limiter:
+                record_wait(url, "rate_limit", limiter.acquire())
+            probe = admit_attempt(limiter, breaker)
+            r = send_request(url, verb, session, params, post_data, headers, stream)
+            r.raise_for_status()
+        except (requests.exceptions.HTTPError, *RETRYABLE_ERRORS) as e:
+            retry_wait = handle_failed_attempt(
+                url,
+                verb,
+                e,
+                attempt=attempt,
+                max_retries=max_retries,
+                limiter=limiter,
+                breaker=breaker,
+            )
+        except BaseException:
+            # A deadline or a cassette miss says nothing about the host
+            if probe:
+                breaker.release_probe()
+            raise
+        else:
+            record_attempt_success(limiter, breaker)
+            return r
+        if retry_wait:
+            time.sleep(retry_wait)
 
-            assert isinstance(r, Response)  # noqa: S101
-            logger.debug(f"{verb.upper()} {r.status_code} {r.reason} {r.url}")
+    raise give_up(url, verb, max_retries)
 
-            r.raise_for_status()
 
-            # Rate limiting for non-localhost requests
-            if "localhost" not in url:
-                time.sleep(BASE_DELAY)
+def parse_json(r: Response) -> Any:
+    """Parse the response body with orjson, without decoding it to text first."""
+    try:
+        return orjson.loads(r.content)
+    except orjson.JSONDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
 
-            return r
 
-        except requests.exceptions.HTTPError as e:
-            # Don't retry on 404s
-            logger.warning(f"HTTP error: {e}")
-            assert r is not None  # noqa: S101
-            if r.status_code == 404:
-                logger.warning(f"Not found: {url}")
-                raise e  # noqa: TRY201
-
-        except (
-            requests.exceptions.ConnectionError,
-            requests.exceptions.ReadTimeout,
-            requests.exceptions.ChunkedEncodingError,
-        ) as e:
-            logger.warning(f"Connection issue: {e}")
-
-        if attempt < max_retries:
-            logger.warning(f"Retry attempt #{attempt}/{max_retries}")
-            logger.warning(f"Trying again in {RETRY_TIMER} seconds...")
-            time.sleep(RETRY_TIMER)
-
-    # All retries exhausted
-    msg = f"Failed to fetch {verb.upper()} from {url} after {max_retries} retries"
-    raise Exception(msg)
+def download_to_file(
+    url: str,
+    path: Path,
+    session: Session | None = None,
+    params: dict[Any, Any] | None = None,
+) -> Path:
+    """Stream a response body to a file, for responses too large for memory.
+
+    The body is written to a .part file first, so `path` is either complete
+    or left untouched.
+    """
+    part_path = path.with_suffix(path.suffix + ".part")
+    r = fetch_with_retries(url, "get", session, params, stream=True)
+    try:
+        with closing(r), part_path.open("wb") as f:
+            for chunk in r.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                f.write(chunk)
+        os.replace(part_path, path)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+    return path
 
 
 def fetch_text(
@@ -96,20 +415,93 @@ def fetch_text(
     return r.text
 
 
+def get_http_cache() -> DiskCache:
+    global _http_cache  # noqa: PLW0603
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = open_disk_cache(get_vdbpy_cache_dir() / "http")
+        return _http_cache
+
+
+def get_http_cache_stats() -> HttpCacheStats:
+    with _http_cache_lock:
+        return replace(_http_cache_stats)
+
+
+def _record_http_cache(hit: bool, stored: bool) -> None:
+    with _http_cache_lock:
+        if hit:
+            _http_cache_stats.hits += 1
+        else:
+            _http_cache_stats.misses += 1
+        if stored:
+            _http_cache_stats.stores += 1
+
+
+def _fetch_json_revalidated(url: str, params: dict[Any, Any] | None) -> Any:
+    """Fetch JSON with the validators of the cached response, if any.
+
+    A 304 Not Modified response returns the cached data without a body.
+    """
+    http_cache = get_http_cache()
+    key = f"{url}_{sorted((params or {}).items())}"
+    cached: dict[str, Any] | None = http_cache.get(key)
+    headers: dict[str, str] = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    r = fetch_with_retries(url, "get", None, params, headers=headers)
+    if r.status_code == 304 and cached:
+        _record_http_cache(hit=True, stored=False)
+        return cached["data"]
+
+    data = parse_json(r)
+    etag = r.headers.get("ETag")
+    last_modified = r.headers.get("Last-Modified")
+    store = bool(etag or last_modified) and "no-store" not in r.headers.get(
+        "Cache-Control", ""
+    )
+    if store:
+        cached = {"etag": etag, "last_modified": last_modified, "data": data}
+        http_cache.set(key, cached, expire=HTTP_CACHE_EXPIRE)
+    _record_http_cache(hit=False, stored=store)
+    return data
+
+
 def fetch_json(
     url: str,
     session: Session | None = None,
     params: dict[Any, Any] | None = None,
+    revalidate: bool = False,
 ) -> dict[Any, Any]:
-    """Fetch JSON content from a URL."""
-    try:
-        r = fetch_with_retries(url, "get", session, params)
-        return r.json()
-    except requests.exceptions.HTTPError as e:
-        # Return empty dict for 404s
-        if e.response.status_code == 404:
-            return {}
-        raise
+    """Fetch JSON content from a URL.
+
+    Identical requests made concurrently by other threads share one response.
+    With `revalidate`, responses with an ETag or Last-Modified header are kept
+    in the HTTP cache and later requests only download the body if it changed.
+    Requests with a session are never cached, as they can be authenticated,
+    and neither are requests made while a cassette is active.
+    """
+    url = get_client().resolve_url(url)
+
+    def fetch() -> dict[Any, Any]:
+        try:
+            # A cassette records and replays full responses without validators
+            if revalidate and session is None and get_cassette() is None:
+                return _fetch_json_revalidated(url, params)
+            r = fetch_with_retries(url, "get", session, params)
+            return parse_json(r)
+        except requests.exceptions.HTTPError as e:
+            # Return empty dict for 404s
+            if e.response.status_code == 404:
+                return {}
+            raise
+
+    key = (url, id(session), repr(sorted((params or {}).items())))
+    return _flight.do(key, fetch)
 
 
 @cache_without_expiration()
@@ -121,17 +513,87 @@ def fetch_cached_json(
     return fetch_json(url, session=session, params=params)
 
 
-def fetch_json_items_with_total_count(
-    url: str,
-    params: dict[Any, Any] | None = None,  # TODO BaseSearchParams type
-    session: requests.Session | None = None,
-    max_results: int = 10**9,
-    limit: int | Callable[..., bool] | None = None,
-    suppress_total_count_warning: bool = False,
-) -> tuple[list[Any], int]:
-    if limit == 0:
-        return [], 0
-    page_size: int = 50
+def submit_in_context[**P, T](
+    executor: Executor, fn: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs
+) -> Future[T]:
+    """Submit `fn` to run in a copy of the current context.
+
+    The call keeps the caller's client, request priority and deadline.
+    """
+    context = copy_context()
+
+    def run() -> T:
+        return context.run(fn, *args, **kwargs)
+
+    return executor.submit(run)
+
+
+class PageIterator:
+    """Pages in order from `workers` threads, see iter_pages."""
+
+    def __init__(
+        self,
+        fetch_page: Callable[[int], list[Any] | None],
+        starts: list[int],
+        workers: int,
+    ):
+        workers = max(1, workers)
+        self._fetch_page = fetch_page
+        self._starts = iter(starts)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="vdbpy-pages"
+        )
+        self._pending: deque[Future[list[Any] | None]] = deque(
+            self._submit(start) for start in islice(self._starts, workers)
+        )
+
+    def _submit(self, start: int) -> Future[list[Any] | None]:
+        return submit_in_context(self._executor, self._fetch_page, start)
+
+    def __iter__(self) -> "PageIterator":
+        """Return the iterator itself."""
+        return self
+
+    def __next__(self) -> list[Any] | None:
+        """Wait for the next page and send the request after the last pending one."""
+        if not self._pending:
+            self.close()
+            raise StopIteration
+        try:
+            page = self._pending.popleft().result()
+        except BaseException:
+            self.close()
+            raise
+        if (start := next(self._starts, None)) is not None:
+            self._pending.append(self._submit(start))
+        return page
+
+    def close(self) -> None:
+        """Cancel the requests that haven't been sent and stop the threads."""
+        self._pending.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_pages(
+    fetch_page: Callable[[int], list[Any] | None],
+    starts: list[int],
+    workers: int = PAGE_WORKERS,
+) -> PageIterator:
+    """Return the pages in order while keeping up to `workers` requests in flight.
+
+    The first requests are sent immediately, before the first page is asked
+    for. Closing the iterator, even before it is started, cancels the pending
+    requests and stops the threads; requests already sent are not waited for.
+    The pages are fetched in copies of the caller's context, so they keep its
+    request priority.
+    """
+    return PageIterator(fetch_page, starts, workers)
+
+
+def prepare_item_params(
+    url: str, params: dict[Any, Any] | None, max_results: int
+) -> tuple[dict[Any, Any], int]:
+    """Return the params of the first page of a listing and its max results."""
     params = params.copy() if params is not None else {}
     logger.debug(f"Fetching all items based on '{url}' with params {params}")
     if "maxResults" in params:
@@ -143,57 +605,131 @@ def fetch_json_items_with_total_count(
         logger.warning(f"Start param not supported for '{ACTIVITY_API_URL}'!")
         logger.warning("Use fetch_all_items_between_dates instead.")
         raise NotImplementedError
-    all_items: list[Any] = []
-    total_count = 0
-    params["maxResults"] = min(page_size, max_results)
+    params["maxResults"] = min(PAGE_SIZE, max_results)
     params["getTotalCount"] = True
-    warned = False
-    page = 1
-    while True:
-        params["start"] = str(page_size * (page - 1))
-        json = fetch_json(url, session=session, params=params)
-        if "items" not in json:
-            logger.warning(f"Items not found in json: {json}")
-            break
-        items = json["items"]
-        total_count = json["totalCount"]
+    params["start"] = "0"
+    return params, max_results
 
-        if min(total_count, max_results) > TOTAL_COUNT_WARNING and not warned:
-            logger.warning(
-                f"Total count {total_count} is higher than {TOTAL_COUNT_WARNING}!"
-            )
-            if not suppress_total_count_warning:
-                _ = input("Press enter to continue...")
-            warned = True
-
-        limit_reached = False
-        if not items:
-            logger.debug("No items found!")
-            break
-        if "id" in items[0]:
-            logger.debug(
-                f"Got {len(items)} items from {items[0]['id']} to {items[-1]['id']}"
+
+def get_page_items(json: dict[Any, Any]) -> list[Any] | None:
+    if "items" not in json:
+        logger.warning(f"Items not found in json: {json}")
+        return None
+    return json["items"]
+
+
+def is_large_listing(total_count: int, max_results: int) -> bool:
+    """Warn about listings of more than TOTAL_COUNT_WARNING items."""
+    if min(total_count, max_results) > TOTAL_COUNT_WARNING:
+        logger.warning(
+            f"Total count {total_count} is higher than {TOTAL_COUNT_WARNING}!"
+        )
+        return True
+    return False
+
+
+def get_page_starts(
+    total_count: int, max_results: int, limit: int | Callable[..., bool] | None
+) -> list[int]:
+    """Return the start params of the pages after the first one."""
+    wanted = min(total_count, max_results)
+    if isinstance(limit, int):
+        wanted = min(wanted, limit)
+    return list(range(PAGE_SIZE, wanted, PAGE_SIZE))
+
+
+def _iter_item_pages(
+    url: str,
+    params: dict[Any, Any] | None,
+    session: requests.Session | None,
+    max_results: int,
+    suppress_total_count_warning: bool,
+    workers: int,
+    limit: int | Callable[..., bool] | None = None,
+) -> Generator[tuple[list[Any], int]]:
+    """Yield (items, total count) per page, at most `max_results` items in total.
+
+    The first page is fetched alone for the total count, the remaining pages
+    through iter_pages.
+    """
+    params, max_results = prepare_item_params(url, params, max_results)
+
+    def fetch_page(start: int) -> list[Any] | None:
+        with default_request_priority("bulk"):
+            json = fetch_json(
+                url, session=session, params={**params, "start": str(start)}
             )
-        for item in items:
-            if isinstance(limit, int) and len(all_items) >= limit:
-                logger.debug(f"Limit {limit} reached, stopping.")
-                limit_reached = True
-                break
-            if callable(limit) and limit(item):
-                logger.debug("Limit condition met, stopping.")
-                limit_reached = True
-                break
-            all_items.append(item)
-        if limit_reached:
-            break
+        return get_page_items(json)
+
+    with default_request_priority("bulk"):
+        json = fetch_json(url, session=session, params=params)
+    items = get_page_items(json)
+    if items is None:
+        return
+    total_count = json["totalCount"]
+    if is_large_listing(total_count, max_results) and not suppress_total_count_warning:
+        _ = input("Press enter to continue...")
+
+    if not items:
+        logger.debug("No items found!")
+        return
+    if len(items) < PAGE_SIZE:
+        yield items[:max_results], total_count
+        return
+
+    starts = get_page_starts(total_count, max_results, limit)
+    with closing(iter_pages(fetch_page, starts, workers)) as pages:
+        yield items[:max_results], total_count
+        item_count = len(items)
+        for page, items in enumerate(pages, start=2):
+            if not items:
+                logger.debug("No items found!")
+                return
+            if "id" in items[0]:
+                logger.debug(
+                    f"Got {len(items)} items from {items[0]['id']} to {items[-1]['id']}"
+                )
+            logger.debug(f"  Page {page}/{1 + len(starts)}")
+            yield items[: max_results - item_count], total_count
+            item_count += len(items)
+            if len(items) < PAGE_SIZE or item_count >= max_results:
+                return
+
+
+def fetch_json_items_with_total_count(
+    url: str,
+    params: dict[Any, Any] | None = None,  # TODO BaseSearchParams type
+    session: requests.Session | None = None,
+    max_results: int = 10**9,
+    limit: int | Callable[..., bool] | None = None,
+    suppress_total_count_warning: bool = False,
+    workers: int = PAGE_WORKERS,
+) -> tuple[list[Any], int]:
+    """Fetch the first page, then the remaining pages with `workers` threads.
 
-        if len(all_items) >= max_results:
-            break
-        if len(items) < page_size:
-            break
-        logger.debug(f"  Page {page}/{1 + (total_count // page_size)}")
-        page += 1
-    return all_items[:max_results], total_count
+    Pages are consumed in order, so `limit` and `max_results` stop the crawl
+    with at most `workers` pages fetched in vain.
+    """
+    if limit == 0:
+        return [], 0
+    all_items: list[Any] = []
+    total_count = 0
+    with closing(
+        _iter_item_pages(
+            url,
+            params,
+            session,
+            max_results,
+            suppress_total_count_warning,
+            workers,
+            limit,
+        )
+    ) as pages:
+        for items, count in pages:
+            total_count = count
+            if take_items(items, all_items, limit):
+                break
+    return all_items, total_count
 
 
 def fetch_json_items(
@@ -203,12 +739,49 @@ def fetch_json_items(
     max_results: int = 10**9,
     limit: int | Callable[..., bool] | None = None,
     suppress_total_count_warning: bool = False,
+    workers: int = PAGE_WORKERS,
 ) -> list[Any]:
     return fetch_json_items_with_total_count(
-        url, params, session, max_results, limit, suppress_total_count_warning
+        url, params, session, max_results, limit, suppress_total_count_warning, workers
     )[0]
 
 
+def iter_json_items(
+    url: str,
+    params: dict[Any, Any] | None = None,
+    session: requests.Session | None = None,
+    max_results: int = 10**9,
+    limit: int | Callable[..., bool] | None = None,
+    suppress_total_count_warning: bool = False,
+    prefetch: int = 1,
+) -> Generator[Any]:
+    """Yield items as their pages arrive, in order.
+
+    `prefetch` pages are requested in the background while the caller
+    processes the current one, so memory stays bounded by the page size.
+    """
+    if limit == 0:
+        return
+    count = 0
+    with closing(
+        _iter_item_pages(
+            url,
+            params,
+            session,
+            max_results,
+            suppress_total_count_warning,
+            prefetch,
+            limit,
+        )
+    ) as pages:
+        for items, _ in pages:
+            for item in items:
+                if is_limit_reached(item, count, limit):
+                    return
+                yield item
+                count += 1
+
+
 def fetch_total_count(
     api_url: str,
     params: dict[Any, Any] | None = None,
@@ -247,63 +820,140 @@ def fetch_cached_total_count(api_url: str, params: dict[Any, Any] | None = None)
     return int(total_count)
 
 
-def fetch_all_items_between_dates(
+def iter_pages_between_dates(
     api_url: str,
     since: str = "2000-01-01T00:00:00Z",
     before: str = "2100-01-01T00:00:00Z",
     date_indicator: str = "createDate",
     params: dict[Any, Any] | None = None,
     page_size: int = PAGE_SIZE,
-    limit: int | Callable[..., bool] | None = None,
-) -> tuple[list[Any], bool]:
-    """Get all items by decreasing 'before' parameter incrementally.
+    checkpoint: Path | None = None,
+) -> Generator[list[Any]]:
+    """Yield pages of new items by decreasing 'before' parameter incrementally.
 
-    Duplicates are possible!
+    Items returned again at the page boundary are dropped. With a checkpoint
+    file, the position is saved once the caller is done with a page, and an
+    interrupted crawl resumes after the last completed page.
     """
-    if limit == 0:
-        return [], False
-    params = params.copy() if params is not None else {}
-    params["maxResults"] = page_size
-    params["before"] = before
-    params["since"] = since
-
-    all_items: list[Any] = []
-
-    logger.debug(
-        f"Fetching all '{api_url}' items from '{since}' to '{before}'"
-        f" with limit {limit}..."
+    cursor = DateCursor(
+        api_url,
+        since=since,
+        before=before,
+        date_indicator=date_indicator,
+        params=params,
+        page_size=page_size,
+        checkpoint=checkpoint,
     )
-
-    limit_reached = False
-    while True:
-        json = fetch_json(api_url, params=params)
+    logger.debug(f"Fetching all '{api_url}' items from '{since}' to '{before}'...")
+    while (page_params := cursor.next_params()) is not None:
+        with default_request_priority("bulk"):
+            json = fetch_json(api_url, params=page_params)
         if "items" not in json:
             logger.warning(f"Items not found in json: {json}")
-            break
-        items = json["items"]
-        if not items:
-            logger.info("No items found, stopping.")
-            break
-
-        for item in items:
-            if isinstance(limit, int) and len(all_items) >= limit:
-                logger.info(f"Limit {limit} reached, stopping.")
-                limit_reached = True
-                break
-            if callable(limit) and limit(item):
-                logger.info("Limit condition met, stopping.")
-                limit_reached = True
-                break
-            all_items.append(item)
+            return
+        items = cursor.advance(json["items"])
+        logger.debug(f"Found {len(items)} new items.")
+        if items:
+            yield items
+        cursor.save()
+
+
+def iter_items_between_dates(
+    api_url: str,
+    since: str = "2000-01-01T00:00:00Z",
+    before: str = "2100-01-01T00:00:00Z",
+    date_indicator: str = "createDate",
+    params: dict[Any, Any] | None = None,
+    page_size: int = PAGE_SIZE,
+    checkpoint: Path | None = None,
+) -> Iterator[Any]:
+    for items in iter_pages_between_dates(
+        api_url, since, before, date_indicator, params, page_size, checkpoint
+    ):
+        yield from items
+
+
+def split_date_range(since: str, before: str, shards: int) -> list[tuple[str, str]]:
+    """Split [since, before) into `shards` equally long ranges, the newest first.
+
+    A `before` in the future is clamped to the current time.
+    """
+    start = parse_date(since)
+    end = min(parse_date(before), datetime.now(UTC))
+    if shards <= 1 or end <= start:
+        return [(since, before)]
+    step = (end - start) / shards
+    bounds = [
+        (start + step * i).strftime("%Y-%m-%dT%H:%M:%SZ") for i in range(1, shards)
+    ]
+    bounds = [since, *bounds, before]
+    return [(bounds[i], bounds[i + 1]) for i in reversed(range(shards))]
+
+
+def fetch_all_items_between_dates_sharded(
+    api_url: str,
+    since: str = "2000-01-01T00:00:00Z",
+    before: str = "2100-01-01T00:00:00Z",
+    date_indicator: str = "createDate",
+    params: dict[Any, Any] | None = None,
+    page_size: int = PAGE_SIZE,
+    shards: int = PAGE_WORKERS,
+) -> list[Any]:
+    """Crawl `shards` date ranges concurrently and merge them by decreasing date.
 
-        if limit_reached:
-            break
+    Each range is walked backwards like fetch_all_items_between_dates. Items
+    at the range boundaries may be returned by two ranges and are dropped.
+    """
+    ranges = split_date_range(since, before, shards)
+    logger.debug(f"Fetching '{api_url}' items in {len(ranges)} date ranges...")
+
+    def fetch_range(date_range: tuple[str, str]) -> list[Any]:
+        range_since, range_before = date_range
+        return list(
+            iter_items_between_dates(
+                api_url, range_since, range_before, date_indicator, params, page_size
+            )
+        )
 
-        if len(items) < PAGE_SIZE:
-            logger.debug(f"Less than {PAGE_SIZE} items, stopping.")
-            break
+    all_items: list[Any] = []
+    seen: set[str] = set()
+    with ThreadPoolExecutor(
+        max_workers=len(ranges), thread_name_prefix="vdbpy-shards"
+    ) as executor:
+        futures = [
+            submit_in_context(executor, fetch_range, date_range)
+            for date_range in ranges
+        ]
+        for items in (future.result() for future in futures):
+            for item in items:
+                if (key := get_item_key(item)) not in seen:
+                    seen.add(key)
+                    all_items.append(item)
+    return all_items
 
-        logger.debug(f"Found {len(items)} items.")
-        params["before"] = items[-1][date_indicator]
 
+def fetch_all_items_between_dates(
+    api_url: str,
+    since: str = "2000-01-01T00:00:00Z",
+    before: str = "2100-01-01T00:00:00Z",
+    date_indicator: str = "createDate",
+    params: dict[Any, Any] | None = None,
+    page_size: int = PAGE_SIZE,
+    limit: int | Callable[..., bool] | None = None,
+) -> tuple[list[Any], bool]:
+    """Get all items by decreasing 'before' parameter incrementally."""
+    if limit == 0:
+        return [], False
+    all_items: list[Any] = []
+    logger.debug(f"Limit is {limit}")
+    limit_reached = False
+    with closing(
+        iter_pages_between_dates(
+            api_url, since, before, date_indicator, params, page_size
+        )
+    ) as pages:
+        for items in pages:
+            limit_reached = take_items(items, all_items, limit)
+            if limit_reached:
+                break
     return all_items, limit_reached
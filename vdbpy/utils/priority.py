@@ -0,0 +1,49 @@
+"""Request priority classes, set per thread or async task.
+
+    with request_priority("interactive"):
+        song = get_song_by_id(song_id)
+
+Requests waiting for the same host's rate limiter are served by priority, so
+interactive lookups jump ahead of queued bulk pagination. Pages fetched by the
+pagination helpers default to "bulk". A request's effective priority improves
+by one class every AGING_SECONDS it has waited, so bulk crawls are never
+starved completely.
+"""
+
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Literal
+
+type RequestPriority = Literal["interactive", "normal", "bulk"]
+
+PRIORITY_RANKS: dict[RequestPriority, int] = {"interactive": 0, "normal": 1, "bulk": 2}
+AGING_SECONDS = 30.0
+
+_priority: ContextVar[RequestPriority | None] = ContextVar(
+    "vdbpy_request_priority", default=None
+)
+
+
+def get_request_priority() -> RequestPriority:
+    return _priority.get() or "normal"
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Generator[None]:
+    """Send the requests made in the block with the given priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@contextmanager
+def default_request_priority(priority: RequestPriority) -> Generator[None]:
+    """Like request_priority, unless the caller has chosen a priority already."""
+    if _priority.get() is not None:
+        yield
+        return
+    with request_priority(priority):
+        yield
@@ -0,0 +1,435 @@
+"""Per-host token bucket rate limiting shared by threads and async tasks.
+
+A token is taken when a request starts, so request latency counts towards the
+interval between requests. Requests queued for a token are served by their
+priority (vdbpy.utils.priority), then in arrival order. Throttling responses
+(429/503) halve the host's rate and honor Retry-After; successful responses
+restore it step by step.
+
+With VDBPY_SHARED_RATE_LIMIT=1 (or use_shared_rate_limit()) the bucket state
+lives in a locked file under the cache directory, so all vdbpy processes on
+the host share one budget.
+"""
+
+import asyncio
+import itertools
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+import orjson
+
+from vdbpy.utils.cache import get_vdbpy_cache_dir
+from vdbpy.utils.cassette import is_replaying
+from vdbpy.utils.console import TRUTHY_VALUES
+from vdbpy.utils.deadline import (
+    DeadlineExceededError,
+    fits_deadline,
+    get_remaining_time,
+)
+from vdbpy.utils.logger import get_logger
+from vdbpy.utils.priority import (
+    AGING_SECONDS,
+    PRIORITY_RANKS,
+    get_request_priority,
+)
+
+logger = get_logger()
+
+# Requests per second and burst size per host (VDBPY_RATE_LIMIT overrides the rate)
+DEFAULT_RATE = float(os.environ.get("VDBPY_RATE_LIMIT", "1"))
+DEFAULT_BURST = 1
+MIN_RATE = 0.05
+BACKOFF_FACTOR = 0.5
+RECOVERY_STEP = 0.05  # Share of the configured rate restored per success
+THROTTLE_STATUS_CODES = (429, 503)
+UNLIMITED_HOSTS = ("localhost",)
+
+
+@dataclass
+class RateLimitStats:
+    grants: int = 0
+    waits: int = 0
+    wait_seconds: float = 0.0
+
+    def record(self, wait: float) -> None:
+        self.grants += 1
+        if wait > 0:
+            self.waits += 1
+            self.wait_seconds += wait
+
+
+@dataclass(eq=False)
+class _Waiter:
+    rank: int
+    sequence: int
+    queued_at: float
+    wake: Callable[[], None]
+
+    def sort_key(self, now: float) -> tuple[float, int]:
+        # Waiting ages a request towards the next better priority class
+        return (self.rank - (now - self.queued_at) / AGING_SECONDS, self.sequence)
+
+
+class TokenBucket:
+    def __init__(self, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST):
+        if rate <= 0 or burst < 1:
+            msg = f"Invalid rate limit: rate={rate}, burst={burst}"
+            raise ValueError(msg)
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.stats = RateLimitStats()
+        # Requests waiting for their turn to reserve a token, by priority
+        self._queue_lock = threading.Lock()
+        self._waiters: list[_Waiter] = []
+        self._busy = False
+        self._sequence = itertools.count()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before using it.
+
+        Tokens can go negative, which queues callers in arrival order.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            wait = max(wait, self._blocked_until - now)
+            self.stats.record(wait)
+            return wait
+
+    def _enqueue(self, wake: Callable[[], None]) -> "_Waiter | None":
+        """Take the turn to reserve a token, or queue up if it is taken."""
+        with self._queue_lock:
+            if not self._busy:
+                self._busy = True
+                return None
+            rank = PRIORITY_RANKS[get_request_priority()]
+            waiter = _Waiter(rank, next(self._sequence), time.monotonic(), wake)
+            self._waiters.append(waiter)
+            return waiter
+
+    def _next_turn(self) -> None:
+        """Hand the turn to the queued request with the best priority."""
+        with self._queue_lock:
+            if not self._waiters:
+                self._busy = False
+                return
+            now = time.monotonic()
+            waiter = min(self._waiters, key=lambda w: w.sort_key(now))
+            self._waiters.remove(waiter)
+        waiter.wake()
+
+    def _leave_queue(self, waiter: _Waiter) -> None:
+        """Give up waiting for the turn, or pass it on if it was handed over."""
+        with self._queue_lock:
+            still_queued = waiter in self._waiters
+            if still_queued:
+                self._waiters.remove(waiter)
+        if not still_queued:
+            self._next_turn()
+
+    def _reserve_within_deadline(self) -> float:
+        wait = self.reserve()
+        if not fits_deadline(wait):
+            self.refund()
+            msg = f"Deadline exceeded before a rate limit wait of {wait:.1f}s"
+            raise DeadlineExceededError(msg)
+        return wait
+
+    def refund(self) -> None:
+        """Return a reserved token that won't be used."""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def acquire(self) -> float:
+        """Wait for a token behind queued requests of a better priority.
+
+        Return the seconds waited. Raise DeadlineExceededError instead of
+        waiting past the deadline.
+        """
+        queued = 0.0
+        turn = threading.Event()
+        if waiter := self._enqueue(turn.set):
+            if not turn.wait(get_remaining_time()):
+                self._leave_queue(waiter)
+                msg = "Deadline exceeded while queued for the rate limiter"
+                raise DeadlineExceededError(msg)
+            queued = time.monotonic() - waiter.queued_at
+        try:
+            wait = self._reserve_within_deadline()
+            if wait > 0:
+                time.sleep(wait)
+        finally:
+            self._next_turn()
+        return queued + wait
+
+    async def acquire_async(self) -> float:
+        loop = asyncio.get_running_loop()
+        queued = 0.0
+        turn = loop.create_future()
+
+        def set_turn() -> None:
+            if not turn.done():
+                turn.set_result(None)
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(set_turn)
+
+        waiter = self._enqueue(wake)
+        if waiter:
+            try:
+                await asyncio.wait_for(turn, get_remaining_time())
+            except TimeoutError:
+                self._leave_queue(waiter)
+                msg = "Deadline exceeded while queued for the rate limiter"
+                raise DeadlineExceededError(msg) from None
+            except asyncio.CancelledError:
+                self._leave_queue(waiter)
+                raise
+            queued = time.monotonic() - waiter.queued_at
+        try:
+            wait = self._reserve_within_deadline()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        finally:
+            self._next_turn()
+        return queued + wait
+
+    def penalize(self, retry_after: float | None = None) -> None:
+        """Back off after a throttling response."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(MIN_RATE, self.rate * BACKOFF_FACTOR)
+            self._tokens = min(self._tokens, 0.0)
+            delay = retry_after if retry_after is not None else 1 / self.rate
+            self._blocked_until = max(self._blocked_until, now + delay)
+            logger.warning(
+                f"Throttled, rate lowered to {self.rate:.2f}/s for {delay:.1f}s"
+            )
+
+    def reward(self) -> None:
+        """Restore part of the configured rate after a successful response."""
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+
+@contextmanager
+def _file_lock(path: Path) -> Generator[None]:
+    with path.open("a+b") as f:
+        if sys.platform == "win32":
+            import msvcrt  # noqa: PLC0415
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl  # noqa: PLC0415
+
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _is_process_alive(pid: int) -> bool:
+    if sys.platform == "win32":
+        return True  # os.kill(pid, 0) would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def get_shared_rate_limit_dir() -> Path:
+    path = get_vdbpy_cache_dir() / "rate_limit"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+class SharedTokenBucket(TokenBucket):
+    """Token bucket whose state is shared by all processes through a locked file.
+
+    Wall clock time is used instead of time.monotonic(), which is per process.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        rate: float = DEFAULT_RATE,
+        burst: float = DEFAULT_BURST,
+        directory: Path | None = None,
+    ):
+        super().__init__(rate, burst)
+        directory = directory or get_shared_rate_limit_dir()
+        self.state_path = directory / f"{host}.json"
+        self.lock_path = directory / f"{host}.lock"
+        self.pid = os.getpid()
+        with self._locked_state() as state:
+            state["stats"] = {
+                pid: stats
+                for pid, stats in state["stats"].items()
+                if _is_process_alive(int(pid))
+            }
+
+    @contextmanager
+    def _locked_state(self) -> Generator[dict[str, Any]]:
+        with self._lock, _file_lock(self.lock_path):
+            try:
+                state = orjson.loads(self.state_path.read_bytes())
+            except (FileNotFoundError, orjson.JSONDecodeError):
+                state = {}
+            now = time.time()
+            state.setdefault("tokens", float(self.burst))
+            state.setdefault("updated", now)
+            state.setdefault("blocked_until", 0.0)
+            state.setdefault("rate", self.max_rate)
+            state.setdefault("stats", {})
+            # Never exceed the rate configured in this process
+            state["rate"] = min(state["rate"], self.max_rate)
+            state["tokens"] = min(
+                self.burst,
+                state["tokens"] + max(0.0, now - state["updated"]) * state["rate"],
+            )
+            state["updated"] = now
+            yield state
+            self.rate = state["rate"]
+            self.state_path.write_bytes(orjson.dumps(state))
+
+    def reserve(self) -> float:
+        with self._locked_state() as state:
+            state["tokens"] -= 1
+            tokens = state["tokens"]
+            wait = -tokens / state["rate"] if tokens < 0 else 0.0
+            wait = max(wait, state["blocked_until"] - state["updated"])
+            self.stats.record(wait)
+            state["stats"][str(self.pid)] = asdict(self.stats)
+            return wait
+
+    def refund(self) -> None:
+        with self._locked_state() as state:
+            state["tokens"] = min(self.burst, state["tokens"] + 1)
+
+    def penalize(self, retry_after: float | None = None) -> None:
+        with self._locked_state() as state:
+            state["rate"] = max(MIN_RATE, state["rate"] * BACKOFF_FACTOR)
+            state["tokens"] = min(state["tokens"], 0.0)
+            delay = retry_after if retry_after is not None else 1 / state["rate"]
+            state["blocked_until"] = max(
+                state["blocked_until"], state["updated"] + delay
+            )
+            logger.warning(
+                f"Throttled, shared rate lowered to {state['rate']:.2f}/s"
+                f" for {delay:.1f}s"
+            )
+
+    def reward(self) -> None:
+        if self.rate >= self.max_rate:
+            return
+        with self._locked_state() as state:
+            state["rate"] = min(
+                self.max_rate, state["rate"] + self.max_rate * RECOVERY_STEP
+            )
+
+
+def get_shared_rate_limit_stats(
+    host: str, directory: Path | None = None
+) -> dict[int, RateLimitStats]:
+    """Return grants and waits of each process sharing the host's budget."""
+    state_path = (directory or get_shared_rate_limit_dir()) / f"{host}.json"
+    try:
+        state = orjson.loads(state_path.read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return {}
+    return {int(pid): RateLimitStats(**stats) for pid, stats in state["stats"].items()}
+
+
+_shared = os.environ.get("VDBPY_SHARED_RATE_LIMIT", "").lower() in TRUTHY_VALUES
+_rate_limits: dict[str, tuple[float, float]] = {}
+_limiters: dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def _make_limiter(host: str) -> TokenBucket:
+    rate, burst = _rate_limits.get(host, (DEFAULT_RATE, DEFAULT_BURST))
+    if _shared:
+        return SharedTokenBucket(host, rate, burst)
+    return TokenBucket(rate, burst)
+
+
+def use_shared_rate_limit(enabled: bool = True) -> None:
+    """Share each host's request budget with the other vdbpy processes."""
+    global _shared  # noqa: PLW0603
+    with _limiters_lock:
+        _shared = enabled
+        _limiters.clear()
+
+
+def configure_rate_limit(
+    host: str, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST
+) -> None:
+    """Set the rate (requests per second) and burst size for a host."""
+    with _limiters_lock:
+        _rate_limits[host] = (rate, burst)
+        _limiters[host] = _make_limiter(host)
+
+
+def get_rate_limiter(url: str) -> TokenBucket | None:
+    """Return the shared limiter for the URL's host, or None if it is unlimited.
+
+    Requests replayed from a cassette are not limited.
+    """
+    host = urlparse(url).netloc
+    if any(unlimited in host for unlimited in UNLIMITED_HOSTS) or is_replaying():
+        return None
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = _make_limiter(host)
+        return _limiters[host]
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid Retry-After header '{value}'")
+        return None
+    return max(0.0, retry_date.timestamp() - time.time())
@@ -0,0 +1,184 @@
+"""Retry backoff, per-host circuit breakers and retry metrics.
+
+Consecutive failures (connection errors, timeouts, 5xx) open the circuit of a
+host. While open, requests to the host fail immediately with CircuitOpenError.
+After RESET_TIMEOUT a single probe request is let through (half-open); its
+outcome closes the circuit or opens it again.
+"""
+
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from typing import Literal
+from urllib.parse import urlparse
+
+from vdbpy.utils.logger import get_logger
+
+logger = get_logger()
+
+BACKOFF_BASE = 1.0  # Seconds before the first retry
+SERVER_ERROR_BACKOFF_BASE = 2.0
+BACKOFF_CAP = 60.0
+FAILURE_THRESHOLD = 5  # Consecutive failures before the circuit opens
+RESET_TIMEOUT = 30.0  # Seconds before an open circuit lets a probe through
+
+type CircuitState = Literal["closed", "open", "half_open"]
+type FailureReason = Literal["connection", "server_error", "throttled", "client_error"]
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE) -> float:
+    """Exponential backoff with jitter: half of the delay is randomized."""
+    delay = min(BACKOFF_CAP, base * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+@dataclass
+class RetryMetrics:
+    failures: Counter[FailureReason] = field(default_factory=Counter)
+    retries: int = 0
+    give_ups: int = 0
+    fail_fast: int = 0  # Client errors that are not retried
+    short_circuits: int = 0  # Requests rejected by an open circuit
+    circuit_opens: int = 0
+    backoff_seconds: float = 0.0
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+    ):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state: CircuitState = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_request(self) -> bool:
+        """Raise CircuitOpenError unless a request to the host may be sent.
+
+        Return whether the request is the half-open probe. A probe must end
+        with record_success, record_failure or release_probe.
+        """
+        with self._lock:
+            if self.state == "closed":
+                return False
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    record_short_circuit(self.host)
+                    msg = f"Circuit for {self.host} is open"
+                    raise CircuitOpenError(msg)
+                logger.info(f"Circuit for {self.host} is half-open, probing...")
+                self.state = "half_open"
+                self._probing = False
+            if self._probing:
+                record_short_circuit(self.host)
+                msg = f"Circuit for {self.host} is half-open and already probing"
+                raise CircuitOpenError(msg)
+            self._probing = True
+            return True
+
+    def release_probe(self) -> None:
+        """Let another request probe after a probe ended without an outcome."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"Circuit for {self.host} closed")
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or (
+                self.state == "closed" and self.failures >= self.failure_threshold
+            ):
+                logger.warning(
+                    f"Circuit for {self.host} opened after {self.failures} failures"
+                )
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                record_circuit_open(self.host)
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_metrics: dict[str, RetryMetrics] = {}
+_lock = threading.Lock()
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    host = urlparse(url).netloc
+    with _lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+def _get_metrics(host: str) -> RetryMetrics:
+    if host not in _metrics:
+        _metrics[host] = RetryMetrics()
+    return _metrics[host]
+
+
+def record_failure_reason(url: str, reason: FailureReason) -> None:
+    with _lock:
+        _get_metrics(urlparse(url).netloc).failures[reason] += 1
+
+
+def record_retry(url: str, backoff_seconds: float) -> None:
+    with _lock:
+        metrics = _get_metrics(urlparse(url).netloc)
+        metrics.retries += 1
+        metrics.backoff_seconds += backoff_seconds
+
+
+def record_give_up(url: str) -> None:
+    with _lock:
+        _get_metrics(urlparse(url).netloc).give_ups += 1
+
+
+def record_fail_fast(url: str) -> None:
+    with _lock:
+        _get_metrics(urlparse(url).netloc).fail_fast += 1
+
+
+def record_circuit_open(host: str) -> None:
+    with _lock:
+        _get_metrics(host).circuit_opens += 1
+
+
+def record_short_circuit(host: str) -> None:
+    with _lock:
+        _get_metrics(host).short_circuits += 1
+
+
+def get_retry_metrics() -> dict[str, RetryMetrics]:
+    """Return a snapshot of the retry decisions made per host."""
+    with _lock:
+        return {
+            host: replace(metrics, failures=Counter(metrics.failures))
+            for host, metrics in _metrics.items()
+        }
+
+
+def reset_retry_state() -> None:
+    """Close all circuits and clear the retry metrics."""
+    with _lock:
+        _breakers.clear()
+        _metrics.clear()
@@ -0,0 +1,107 @@
+"""Coalescing of identical calls made concurrently by several threads.
+
+The first thread to ask for a key runs the call; threads asking for the same
+key while it is in flight wait for it and get a copy of its result (or its
+exception) instead of running their own.
+"""
+
+import copy
+import threading
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, replace
+from typing import Any
+
+from vdbpy.utils.deadline import (
+    DeadlineExceededError,
+    check_deadline,
+    get_remaining_time,
+)
+from vdbpy.utils.logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int = 0
+    executions: int = 0
+    shared: int = 0  # Calls served by another thread's execution
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.stats = SingleFlightStats()
+
+    def do[T](self, key: Hashable, func: Callable[[], T]) -> T:
+        """Run `func`, unless a call with the same key is in flight already.
+
+        Waiting threads get a deep copy of the result, so they can't see each
+        other's modifications. They stop waiting at their own deadline, and
+        run the call again if the leader's deadline ran out before theirs.
+        """
+        with self._lock:
+            self.stats.calls += 1
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                is_leader = call is None
+                if call is None:
+                    call = self._calls[key] = _Call()
+                    self.stats.executions += 1
+                else:
+                    self.stats.shared += 1
+            if is_leader:
+                return self._lead(key, call, func)
+
+            logger.debug(f"Waiting for the call in flight for '{key}'")
+            if not call.done.wait(get_remaining_time()):
+                msg = f"Deadline exceeded while waiting for the call for '{key}'"
+                raise DeadlineExceededError(msg)
+            if isinstance(call.error, DeadlineExceededError):
+                # The leader's time budget ran out, which doesn't mean ours did
+                check_deadline(f"taking over the call for '{key}'")
+                logger.debug(f"Taking over the call for '{key}'")
+                with self._lock:
+                    self.stats.shared -= 1
+                continue
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+    def _lead[T](self, key: Hashable, call: _Call, func: Callable[[], T]) -> T:
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+_flights: dict[str, SingleFlight] = {}
+_flights_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    with _flights_lock:
+        if name not in _flights:
+            _flights[name] = SingleFlight()
+        return _flights[name]
+
+
+def get_single_flight_stats() -> dict[str, SingleFlightStats]:
+    """Return a snapshot of the coalesced calls per single-flight group."""
+    with _flights_lock:
+        return {name: replace(flight.stats) for name, flight in _flights.items()}